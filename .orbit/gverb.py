@@ -11,11 +11,20 @@
 
 import os, sys
 import sys
+import ast
+import glob
+import json
+import hashlib
 import random
+import time
+import asyncio
+import atexit
 import argparse
-from typing import List
+import itertools
+from typing import List, Tuple, TextIO
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
 
-from mod import Command, Status, Env, Generic, Blueprint, Hdl
+from mod import Command, Status, Env, Generic, Blueprint, Hdl, Cache, Model, Timings
 
 # Set up environment and constants
 
@@ -34,16 +43,26 @@ parser.add_argument('--generic', '-g', action='append', type=Generic.from_arg, d
 parser.add_argument('--std', action='store', default='93', metavar='EDITION', help="specify the VHDL edition (87, 93, 02, 08, 19)")
 parser.add_argument('--relax', action='store_true', help='relax semantic rules for ghdl')
 parser.add_argument('--exit-on', action='store', default='error', metavar='LEVEL', help='select severity level to exit on (default: error)')
+parser.add_argument('--jobs', '-j', action='store', type=int, default=os.cpu_count(), metavar='NUM', help='set the number of hdl units to analyze at once')
+parser.add_argument('--force', action='store_true', help='ignore cached results from previous runs')
 
 parser.add_argument('--log', action='store', default='events.log', help='specify the log file path written during simulation')
 parser.add_argument('--skip-model', action='store_true', help='skip execution of a design model (if exists)')
+parser.add_argument('--inline-model', action='store_true', help='run the design model inside gverb instead of through verb')
+parser.add_argument('--profile-model', action='store_true', help='run the design model under cProfile and save its stats')
 parser.add_argument('--seed', action='store', type=int, nargs='?', default=None, const=random.randrange(sys.maxsize), metavar='NUM', help='set the randomness seed')
 parser.add_argument('--loop-limit', action='store', type=int, default=10_000, help='specify the limit of tests before timing out')
+parser.add_argument('--timeout', action='store', type=float, default=None, metavar='SECONDS', help='set the time limit of each simulation')
+parser.add_argument('--waves', action='store', choices=['vcd', 'ghw', 'fst', 'none'], default='vcd', help='select the waveform format to dump (default: vcd)')
+parser.add_argument('--waves-on-failure', action='store_true', help='simulate without waveforms and only dump the vectors up to a failure')
+parser.add_argument('--regress', action='append', type=Generic.from_arg, default=[], metavar='KEY=V1,V2,...', help='run every combination of generic values in parallel')
 
 args = parser.parse_args()
 
 MAX_TESTS = int(args.loop_limit)
 SKIP_MODEL = bool(args.skip_model)
+INLINE_MODEL = bool(args.inline_model)
+PROFILE_MODEL = bool(args.profile_model)
 IS_RELAXED = bool(args.relax)
 GENERICS: List[Generic] = args.generic
 STD_VHDL = str(args.std)
@@ -51,6 +70,29 @@ SEED = args.seed
 LINT_ONLY = bool(args.lint)
 SEVERITY_LVL = str(args.exit_on)
 EVENTS_LOG_FILE = str(args.log)
+JOBS = max(1, int(args.jobs))
+FORCE = bool(args.force)
+REGRESS: List[Generic] = args.regress
+SIM_TIMEOUT = args.timeout
+WAVES = None if args.waves == 'none' else str(args.waves)
+WAVES_ON_FAILURE = bool(args.waves_on_failure)
+
+# results from previous runs are kept in the build directory
+CACHE = Cache('gverb-cache.json')
+
+# time spent in each phase is saved to the build directory on exit
+TIMINGS = Timings()
+atexit.register(lambda: TIMINGS.save(
+    'timings.json',
+    argv=sys.argv[1:],
+    dut=Env.read("ORBIT_DUT_NAME", missing_ok=True),
+    tb=BENCH,
+    generics=[item.to_str() for item in GENERICS],
+    seed=SEED,
+))
+
+# file to save the design model's profiling stats to (if enabled)
+MODEL_PROFILE = 'model.prof'
 
 # Construct the options for GHDL
 GHDL_OPTS = ['--ieee=synopsys', '--syn-binding']
@@ -78,18 +120,112 @@ HAS_MODEL = py_model != None
 
 # Analyze VHDL source code
 
-# analyze units
-print("info: analyzing hdl source code ...")
-item: Hdl
-for item in rtl_order:
-    print('  ->', Env.quote_str(item.path))
-    Command('ghdl') \
+def analyze(lib: str, items: List[Hdl]) -> Tuple[str, Status]:
+    '''
+    Analyzes the units `items` into the library `lib` with a single ghdl call,
+    with its output captured so concurrent logs do not interleave.
+    '''
+    return Command('ghdl') \
         .arg('-a') \
         .args(GHDL_OPTS) \
-        .args(['--work='+str(item.lib), item.path]) \
-        .spawn() \
-        .unwrap()
-    pass
+        .arg('--work='+str(lib)) \
+        .args([item.path for item in items]) \
+        .output()
+
+
+def find_unchanged(order: List[Hdl], cache: dict) -> List[Hdl]:
+    '''
+    Returns the units in `order` that were analyzed in a previous run with the
+    same contents and library, and whose dependencies are also unchanged.
+    '''
+    unchanged = []
+    for item in order:
+        entry = cache.get(item.path)
+        if entry is None or entry['lib'] != item.lib or entry['hash'] != item.hash:
+            continue
+        # the library itself must still exist in the build directory
+        if len(glob.glob(item.lib+'-obj*.cf')) == 0:
+            continue
+        if all(dep in unchanged for dep in item.deps):
+            unchanged += [item]
+    return unchanged
+
+
+def find_levels(order: List[Hdl], done: set) -> List[List[Hdl]]:
+    '''
+    Groups the units in `order` that are not in `done` by dependency level, so
+    every unit in a level only depends on units in `done` or earlier levels.
+    '''
+    levels = dict()
+    for item in order:
+        if item in done:
+            continue
+        levels[item] = 1 + max([levels[dep] for dep in item.deps if dep in levels], default=-1)
+    groups = [[] for _ in range(0, max(levels.values(), default=-1)+1)]
+    for (item, level) in levels.items():
+        groups[level] += [item]
+    return groups
+
+
+def analyze_all(order: List[Hdl], jobs: int) -> Status:
+    '''
+    Analyzes the units in `order` using up to `jobs` concurrent processes.
+
+    Units are scheduled by dependency level: every unit whose dependencies are
+    already analyzed starts at once. Since ghdl rewrites the library index file
+    after each call, the units of a level that share a library are analyzed
+    together in one call, while different libraries run concurrently.
+
+    Units that are unchanged since the last run with the same ghdl options are
+    skipped.
+    '''
+    Hdl.link(order)
+    for item in order:
+        item.hash = Cache.hash_file(item.path)
+    # any change to the options invalidates every previous analysis
+    cache = CACHE.get('analysis', dict())
+    units = cache.get('units', dict()) if cache.get('options') == GHDL_OPTS and FORCE == False else dict()
+    done = set(find_unchanged(order, units))
+    if len(done) > 0:
+        print('info: skipping', len(done), 'unchanged unit(s)')
+    levels = find_levels(order, done)
+    # forget units until they are analyzed again
+    for level in levels:
+        for item in level:
+            units.pop(item.path, None)
+    failed = False
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for level in levels:
+            batches = dict()
+            for item in level:
+                batches.setdefault(item.lib, []).append(item)
+            running = dict((pool.submit(analyze, lib, items), items) for (lib, items) in batches.items())
+            for job in running:
+                items = running[job]
+                (out, status) = job.result()
+                for item in items:
+                    print('  ->', Env.quote_str(item.path))
+                if len(out) > 0:
+                    print(out, end='' if out.endswith('\n') else '\n')
+                if status == Status.OKAY:
+                    for item in items:
+                        done.add(item)
+                        units[item.path] = {'lib': item.lib, 'hash': item.hash}
+                else:
+                    failed = True
+            # later levels depend on the failed units
+            if failed == True:
+                break
+    CACHE.set('analysis', {'options': GHDL_OPTS, 'units': units})
+    CACHE.save()
+    return Status.FAIL if failed == True else Status.OKAY
+
+
+# analyze units
+print("info: analyzing hdl source code ...")
+with TIMINGS.phase('analysis'):
+    status = analyze_all(rtl_order, JOBS)
+status.unwrap()
 
 
 # halt workflow here when only providing lint
@@ -100,31 +236,247 @@ if LINT_ONLY == True:
 
 # Run the design model to generate test vectors
 
-if HAS_MODEL == True and SKIP_MODEL == False:
-    ORBIT_TB = Env.read("ORBIT_TB_NAME", missing_ok=False)
-    ORBIT_DUT = Env.read("ORBIT_DUT_NAME", missing_ok=False)
-
-    # export the interfaces using orbit to get the json data format
-    dut_data = Command("orbit").arg("get").arg(ORBIT_DUT).arg("--json").output()[0].strip()
-    tb_data = Command("orbit").arg("get").arg(ORBIT_TB).arg("--json").output()[0].strip()
-
-    # tb_json = json.loads(tb_data)
-    # # modify the json data and set defaults
-    # for g in GENERICS:
-    #     for tb_gen in tb_json['generics']:
-    #         if tb_gen['identifier'].upper() == g.key.upper():
-    #             tb_gen['default'] = str(g.val)
-    #             pass
-    #         pass
-    #     pass
-    # tb_data = json.dumps(tb_json, separators=(',', ':'))
-    # # send environment variables for verb
-    # Env.write("VERTEX_DUT", dut_data.strip())
-    # Env.write("VERTEX_TB", tb_data.strip())
-    # Env.write("VERTEX_EVENTS_LOG", EVENTS_LOG_FILE)
-    # Env.write("VERTEX_COVERAGE_REPORT", 'coverage.txt')
-    # Env.write("VERTEX_RANDOM_SEED", SEED)
-    # Env.write("VERTEX_TEST_COUNT_LIMIT", MAX_TESTS)
+# files written by the model that are reused while its fingerprint is unchanged
+VECTOR_FILES = ['inputs.txt', 'outputs.txt', 'coverage.txt']
+
+
+def say(log: TextIO, *msg):
+    '''
+    Prints a message to the terminal or to a run's `log` (if set).
+    '''
+    print(*msg, file=log if log is not None else sys.stdout)
+    pass
+
+
+def launch(cmd: Command, log: TextIO=None, timeout: float=None) -> Status:
+    '''
+    Runs a command attached to the terminal, or with its output streamed into
+    a run's `log` (if set). The command is killed after `timeout` seconds (if
+    set).
+    '''
+    if log is None:
+        status = cmd.spawn(timeout=timeout)
+    else:
+        status = cmd.tee(log, timeout=timeout)
+    if cmd.timed_out == True:
+        say(log, "error: command timed out after", timeout, "seconds")
+    return status
+
+
+def model_sources(path: str) -> List[str]:
+    '''
+    Returns the model at `path` along with every module it imports (directly
+    or indirectly) from the model's directory.
+    '''
+    root = os.path.dirname(os.path.abspath(path))
+    sources = []
+    queue = [os.path.abspath(path)]
+    while len(queue) > 0:
+        source = queue.pop(0)
+        if source in sources:
+            continue
+        sources += [source]
+        with open(source, 'r') as f:
+            tree = ast.parse(f.read(), filename=source)
+        for node in ast.walk(tree):
+            names = []
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module is not None and node.level == 0:
+                names = [node.module]
+            for name in names:
+                local = os.path.join(root, name.split('.')[0]+'.py')
+                if os.path.exists(local):
+                    queue += [local]
+    return sorted(sources)
+
+
+def model_fingerprint(path: str, generics: List[Generic]) -> str:
+    '''
+    Computes a digest of everything that determines the model's test vectors.
+    Generics select the model's stimulus (such as `DIRECTED` for `hamm_dec`),
+    so both the overridden values and the defaults in the exported interfaces
+    are included.
+    '''
+    key = {
+        'sources': {os.path.basename(s): Cache.hash_file(s) for s in model_sources(path)},
+        'dut': Env.read("ORBIT_DUT_NAME", missing_ok=True),
+        'tb': Env.read("ORBIT_TB_NAME", missing_ok=True),
+        'interfaces': list(get_interfaces()),
+        'generics': sorted(item.to_str() for item in generics),
+        'seed': SEED,
+        'loop-limit': MAX_TESTS,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def vectors_are_cached(cache: Cache, fingerprint: str, workdir: str) -> bool:
+    '''
+    Checks if the vector files from a previous run with the same `fingerprint`
+    are still in `workdir` and unmodified.
+    '''
+    entry = cache.get('vectors')
+    if FORCE == True or entry is None or entry['fingerprint'] != fingerprint:
+        return False
+    for (name, digest) in entry['files'].items():
+        path = os.path.join(workdir, name)
+        if os.path.exists(path) == False or Cache.hash_file(path) != digest:
+            return False
+    return True
+
+
+_interfaces: Tuple[str, str] = None
+
+
+def is_json(data: str) -> bool:
+    '''
+    Checks if `data` parses as json.
+    '''
+    try:
+        json.loads(data)
+    except ValueError:
+        return False
+    return True
+
+
+def get_interfaces() -> Tuple[str, str]:
+    '''
+    Exports the DUT and testbench interfaces as json using orbit. The result
+    is shared by every run of the model and reused across runs until a design
+    file changes.
+    '''
+    global _interfaces
+    if _interfaces is None:
+        ORBIT_TB = Env.read("ORBIT_TB_NAME", missing_ok=False)
+        ORBIT_DUT = Env.read("ORBIT_DUT_NAME", missing_ok=False)
+
+        key = hashlib.sha256(json.dumps({
+            'dut': ORBIT_DUT,
+            'tb': ORBIT_TB,
+            'sources': [item.hash if item.hash != None else Cache.hash_file(item.path) for item in rtl_order],
+        }).encode('utf-8')).hexdigest()
+        entry = CACHE.get('interfaces')
+        if FORCE == False and entry != None and entry['key'] == key and is_json(entry['dut']) == True and is_json(entry['tb']) == True:
+            _interfaces = (entry['dut'], entry['tb'])
+            return _interfaces
+
+        # export the interfaces using orbit to get the json data format
+        async def export():
+            return await asyncio.gather(
+                Command("orbit").arg("get").arg(ORBIT_DUT).arg("--json").run_async(),
+                Command("orbit").arg("get").arg(ORBIT_TB).arg("--json").run_async(),
+            )
+        ((dut_data, dut_status), (tb_data, tb_status)) = asyncio.run(export())
+        dut_data = dut_data.strip()
+        tb_data = tb_data.strip()
+        # only keep exports that succeeded so a failure is never reused
+        for (name, data, status) in [(ORBIT_DUT, dut_data, dut_status), (ORBIT_TB, tb_data, tb_status)]:
+            if status != Status.OKAY or is_json(data) == False:
+                print("error: failed to export the interface of", Env.quote_str(name), "with orbit")
+                if len(data) > 0:
+                    print(data)
+                Status.FAIL.unwrap()
+        _interfaces = (dut_data, tb_data)
+        CACHE.set('interfaces', {'key': key, 'dut': dut_data, 'tb': tb_data})
+        CACHE.save()
+    return _interfaces
+
+
+# worker interpreters that are reused for every inline run of the model
+_model_pool: ProcessPoolExecutor = None
+
+
+def model_env(generics: List[Generic]) -> dict:
+    '''
+    Returns the environment read by verb's python library when the model is
+    run inline, with the testbench generics set to their overridden values.
+    '''
+    (dut_data, tb_data) = get_interfaces()
+    tb_json = json.loads(tb_data)
+    # modify the json data and set defaults
+    for g in generics:
+        for tb_gen in tb_json['generics']:
+            if tb_gen['identifier'].upper() == g.key.upper():
+                tb_gen['default'] = str(g.val)
+                pass
+            pass
+        pass
+    tb_data = json.dumps(tb_json, separators=(',', ':'))
+    return {
+        'VERTEX_DUT': dut_data,
+        'VERTEX_TB': tb_data,
+        'VERTEX_EVENTS_LOG': EVENTS_LOG_FILE,
+        'VERTEX_COVERAGE_REPORT': 'coverage.txt',
+        'VERTEX_RANDOM_SEED': SEED,
+        'VERTEX_TEST_COUNT_LIMIT': MAX_TESTS,
+        'GVERB_LOOP_LIMIT': MAX_TESTS,
+    }
+
+
+def run_model_inline(generics: List[Generic], workdir: str, log: TextIO) -> Status:
+    '''
+    Runs the design model in this interpreter, or in one of the reused worker
+    interpreters during a regression.
+    '''
+    model = Model(py_model)
+    profile = os.path.abspath(os.path.join(workdir, MODEL_PROFILE)) if PROFILE_MODEL == True else None
+    args = (os.path.abspath(workdir), model_env(generics), SEED, profile)
+    if _model_pool != None:
+        (out, status) = _model_pool.submit(model.run, *args).result()
+    else:
+        (out, status) = model.run(*args)
+    if log is None:
+        print(out, end='')
+    else:
+        log.write(out)
+    return status
+
+
+def run_model(generics: List[Generic], workdir: str='.', log: TextIO=None) -> Status:
+    '''
+    Runs the design model from `workdir` to generate its test vectors, unless
+    the vectors from a previous run can be reused.
+    '''
+    cache = CACHE if workdir == '.' else Cache(os.path.join(workdir, 'gverb-cache.json'))
+    # vectors are only reproducible (and reusable) when a seed is given
+    fingerprint = model_fingerprint(py_model, generics) if SEED != None else None
+
+    # profiling needs the model to run, so cached vectors are never reused
+    if fingerprint != None and PROFILE_MODEL == False and vectors_are_cached(cache, fingerprint, workdir) == True:
+        say(log, "info: reusing test vectors from previous run of model", Env.quote_str(py_model))
+        return Status.OKAY
+
+    # forget the previous vectors until the model succeeds
+    cache.set('vectors', None)
+    cache.save()
+
+    if INLINE_MODEL == True:
+        status = run_model_inline(generics, workdir, log)
+    else:
+        status = run_model_verb(generics, workdir, log)
+    if status != Status.OKAY:
+        return status
+
+    if PROFILE_MODEL == True:
+        say(log, "info: model profile saved at:", os.path.abspath(os.path.join(workdir, MODEL_PROFILE)))
+
+    if fingerprint != None:
+        cache.set('vectors', {
+            'fingerprint': fingerprint,
+            'files': {name: Cache.hash_file(os.path.join(workdir, name)) for name in VECTOR_FILES if os.path.exists(os.path.join(workdir, name))},
+        })
+        cache.save()
+    return status
+
+
+def run_model_verb(generics: List[Generic], workdir: str, log: TextIO) -> Status:
+    '''
+    Runs the design model in a new interpreter through `verb model`.
+    '''
+    (dut_data, tb_data) = get_interfaces()
+
+    # models read the number of vectors to generate from the environment
+    Env.write("GVERB_LOOP_LIMIT", MAX_TESTS)
 
     status = Command("verb") \
         .arg("model") \
@@ -133,60 +485,64 @@ if HAS_MODEL == True and SKIP_MODEL == False:
         .arg("--loop-limit="+str(MAX_TESTS) if MAX_TESTS != None else None) \
         .arg("--dut").arg(dut_data) \
         .arg("--tb").arg(tb_data) \
-        .args(['-g=' + item.to_str() for item in GENERICS]) \
+        .args(['-g=' + item.to_str() for item in generics]) \
         .arg("python") \
         .arg("--") \
-        .arg(py_model) \
-        .spawn()
-    
-    status.unwrap()
+        .args(['-m', 'cProfile', '-o', MODEL_PROFILE] if PROFILE_MODEL == True else None) \
+        .arg(os.path.abspath(py_model)) \
+        .cwd(workdir)
 
-    # import runpy, sys, os
-    # # Switch the sys.path[0] from this script's path to the model's path
-    # this_script_path = sys.path[0]
-    # sys.path[0] = os.path.dirname(py_model)
-    # print("info: running python software model ...")
-    # # run the python model script in its own namespace
-    # runpy.run_path(py_model, init_globals={})
-    # sys.path[0] = this_script_path
-    pass
+    return launch(status, log)
 
 
 # Run the VHDL simulation
 
-if BENCH is None:
-    exit('error: no testbench to simulate\n\nhint: use \"--lint\" to only analyze the HDL code')
-
-VCD_FILE = str(BENCH)+'.vcd'
-
-print("info: starting hdl simulation for testbench", Env.quote_str(BENCH), "...")
-status: Status = Command('ghdl') \
-    .arg('-r') \
-    .args(GHDL_OPTS) \
-    .arg('--work='+working_lib) \
-    .arg(BENCH) \
-    .args(['--vcd='+VCD_FILE, '--assert-level='+SEVERITY_LVL]) \
-    .args(['-g' + item.to_str() for item in GENERICS]) \
-    .spawn(verbose=False)
+# ghdl option to dump each waveform format to a file
+WAVE_OPTS = {
+    'vcd': '--vcd=',
+    'ghw': '--wave=',
+    'fst': '--fst=',
+}
+
+
+def run_simulation(generics: List[Generic], workdir: str='.', log: TextIO=None, waves: str=None) -> Status:
+    '''
+    Runs the testbench from `workdir` using the libraries analyzed in the
+    build directory, dumping waveforms in the format `waves` (if set).
+    '''
+    say(log, "info: starting hdl simulation for testbench", Env.quote_str(BENCH), "...")
+    build_dir = os.getcwd()
+    wave_file = str(BENCH)+'.'+waves if waves != None else None
+    status: Status = launch(Command('ghdl') \
+        .arg('-r') \
+        .args(GHDL_OPTS) \
+        .arg('--work='+working_lib) \
+        .args(['--workdir='+build_dir, '-P'+build_dir] if os.path.abspath(workdir) != build_dir else None) \
+        .arg(BENCH) \
+        .arg(WAVE_OPTS[waves]+wave_file if waves != None else None) \
+        .arg('--assert-level='+SEVERITY_LVL) \
+        .args(['-g' + item.to_str() for item in generics]) \
+        .cwd(workdir), log, SIM_TIMEOUT)
+    if status == Status.OKAY:
+        say(log, 'info: simulation complete')
+    if wave_file != None:
+        say(log, "info:", waves, "file saved at:", os.path.abspath(os.path.join(workdir, wave_file)))
+    return status
 
-status.unwrap()
-print('info: simulation complete')
-print("info: vcd file saved at:", os.path.join(os.getcwd(), VCD_FILE))
 
 # Analyze results from runnning simulation
 
-rc: int = 0
-
-if HAS_MODEL == True:
-
-    status: Status = Command('verb') \
+def run_check(workdir: str='.', log: TextIO=None) -> Status:
+    '''
+    Checks the events logged by the simulation in `workdir` against the model.
+    '''
+    coverage = os.path.join(workdir, 'coverage.txt')
+    status: Status = launch(Command('verb') \
         .arg('check') \
         .arg(EVENTS_LOG_FILE) \
-        .arg("--coverage=coverage.txt" if os.path.exists('coverage.txt') else None) \
+        .arg("--coverage=coverage.txt" if os.path.exists(coverage) else None) \
         .arg('--stats') \
-        .spawn()
-    
-    status.unwrap()
+        .cwd(workdir), log)
 
     # # print("info: Simulation history saved at:", verb.log.get_event_log_path())
     # print("info: analyzing results ...\n")
@@ -203,6 +559,167 @@ if HAS_MODEL == True:
     # print("info: simulation score:", verb.analysis.report_score())
 
     # rc = 0 if verb.analysis.check() == True and verb.coverage.check() == True else 101
+    return status
+
+
+# Dump waveforms only around a failure
+
+def read_rows(path: str) -> List[str]:
+    with open(path, 'r') as f:
+        return f.readlines()
+
+
+def replay(generics: List[Generic], inputs: List[str], outputs: List[str], workdir: str, log: TextIO, waves: str=None) -> Status:
+    '''
+    Simulates and checks only the given vector rows from `workdir`.
+    '''
+    os.makedirs(workdir, exist_ok=True)
+    with open(os.path.join(workdir, 'inputs.txt'), 'w') as f:
+        f.writelines(inputs)
+    with open(os.path.join(workdir, 'outputs.txt'), 'w') as f:
+        f.writelines(outputs)
+    status = run_simulation(generics, workdir, log, waves)
+    if status == Status.OKAY:
+        status = run_check(workdir, log)
+    return status
+
+
+def dump_failure(generics: List[Generic], workdir: str='.', log: TextIO=None) -> Status:
+    '''
+    Re-runs a failed simulation with waveforms enabled.
+
+    When the model's vectors are available, the first failing vector is
+    located by bisecting the vectors without waveforms, and only the vectors
+    up to and including it are dumped from the 'failure' directory. Otherwise
+    the entire simulation is re-run with waveforms.
+
+    Testbenches such as `hamm_dec_pipe_tb` hold state from one vector to the
+    next, so every replay starts from the first vector (a prefix of the
+    vectors) to reach the failure with the same state as the full run.
+    '''
+    if WAVES is None:
+        return Status.OKAY
+    inputs = os.path.join(workdir, 'inputs.txt')
+    outputs = os.path.join(workdir, 'outputs.txt')
+    if HAS_MODEL == False or os.path.exists(inputs) == False or os.path.exists(outputs) == False:
+        say(log, "info: re-running simulation with waveforms ...")
+        return run_simulation(generics, workdir, log, WAVES)
+
+    inputs = read_rows(inputs)
+    outputs = read_rows(outputs)
+    scratch = os.path.join(workdir, 'failure')
+    say(log, "info: locating first failing vector of", len(inputs), "...")
+    with open(os.path.join(workdir, 'bisect.log'), 'w') as trace:
+        # the first `lo` vectors pass and the first `hi` vectors fail
+        (lo, hi) = (0, len(inputs))
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if replay(generics, inputs[:mid], outputs[:mid], scratch, trace) != Status.OKAY:
+                hi = mid
+            else:
+                lo = mid
+    say(log, "info: dumping waveforms for vectors 0 to", lo, "(failure at vector "+str(lo)+") ...")
+    return replay(generics, inputs[:lo+1], outputs[:lo+1], scratch, log, WAVES)
+
+
+# Run a regression across combinations of generics
+
+class Run:
+    def __init__(self, generics: List[Generic]):
+        self.generics = generics
+        self.name = '_'.join(item.to_str() for item in generics)
+        self.workdir = os.path.join('regress', self.name)
+        self.status = Status.FAIL
+        self.vectors = 0
+        self.elapsed = 0.0
+        pass
     pass
 
-exit(rc)
+
+def regress(run: Run) -> Run:
+    '''
+    Generates vectors, simulates, and checks one combination of generics in
+    its own directory with all output saved to its log file.
+    '''
+    start = time.perf_counter()
+    os.makedirs(run.workdir, exist_ok=True)
+    with open(os.path.join(run.workdir, 'run.log'), 'w') as log:
+        status = Status.OKAY
+        if HAS_MODEL == True and SKIP_MODEL == False:
+            status = run_model(run.generics, run.workdir, log)
+        if status == Status.OKAY:
+            status = run_simulation(run.generics, run.workdir, log, None if WAVES_ON_FAILURE == True else WAVES)
+            if status == Status.OKAY and HAS_MODEL == True:
+                status = run_check(run.workdir, log)
+            if status != Status.OKAY and WAVES_ON_FAILURE == True:
+                dump_failure(run.generics, run.workdir, log)
+    run.status = status
+    inputs = os.path.join(run.workdir, 'inputs.txt')
+    if os.path.exists(inputs):
+        with open(inputs, 'r') as f:
+            run.vectors = sum(1 for _ in f)
+    run.elapsed = time.perf_counter() - start
+    return run
+
+
+def regress_all(matrix: List[Generic], jobs: int) -> Status:
+    '''
+    Runs every combination of the comma-separated generic values in `matrix`
+    (together with the fixed generics) across up to `jobs` threads, then
+    prints a summary table.
+    '''
+    axes = [[Generic(item.key, val) for item in [axis] for val in axis.val.split(',')] for axis in matrix]
+    runs = [Run(GENERICS + list(combo)) for combo in itertools.product(*axes)]
+    print("info: running regression of", len(runs), "configuration(s) ...")
+    # interfaces are exported once for every run
+    if HAS_MODEL == True and SKIP_MODEL == False:
+        with TIMINGS.phase('interfaces'):
+            get_interfaces()
+    global _model_pool
+    if INLINE_MODEL == True and HAS_MODEL == True and SKIP_MODEL == False:
+        _model_pool = ProcessPoolExecutor(max_workers=jobs)
+        # start the workers before any threads exist
+        wait([_model_pool.submit(os.getpid) for _ in range(jobs)])
+    with TIMINGS.phase('regression'), ThreadPoolExecutor(max_workers=jobs) as pool:
+        runs = list(pool.map(regress, runs))
+    if _model_pool != None:
+        _model_pool.shutdown()
+    width = max([len(run.name) for run in runs] + [len('configuration')])
+    print()
+    print('configuration'.ljust(width), 'result', 'vectors'.rjust(9), 'time (s)'.rjust(9))
+    print('-'*width, '------', '-'*9, '-'*9)
+    for run in runs:
+        result = 'pass' if run.status == Status.OKAY else 'FAIL'
+        print(run.name.ljust(width), result.ljust(6), str(run.vectors).rjust(9), format(run.elapsed, '.2f').rjust(9))
+    failures = [run for run in runs if run.status != Status.OKAY]
+    for run in failures:
+        print("info: see log for failed configuration at:", os.path.abspath(os.path.join(run.workdir, 'run.log')))
+    return Status.OKAY if len(failures) == 0 else Status.FAIL
+
+
+if BENCH is None:
+    exit('error: no testbench to simulate\n\nhint: use \"--lint\" to only analyze the HDL code')
+
+if len(REGRESS) > 0:
+    regress_all(REGRESS, JOBS).unwrap()
+    exit(0)
+
+if HAS_MODEL == True and SKIP_MODEL == False:
+    with TIMINGS.phase('interfaces'):
+        get_interfaces()
+    with TIMINGS.phase('model'):
+        status = run_model(GENERICS)
+    status.unwrap()
+
+with TIMINGS.phase('simulation'):
+    status = run_simulation(GENERICS, waves=None if WAVES_ON_FAILURE == True else WAVES)
+
+if status == Status.OKAY and HAS_MODEL == True:
+    with TIMINGS.phase('check'):
+        status = run_check()
+
+if status != Status.OKAY and WAVES_ON_FAILURE == True:
+    with TIMINGS.phase('waves'):
+        dump_failure(GENERICS)
+
+status.unwrap()
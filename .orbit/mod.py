@@ -5,7 +5,21 @@
 # in Python.
 
 import os
-from typing import List, Tuple
+import re
+import io
+import sys
+import json
+import time
+import runpy
+import asyncio
+import random
+import signal
+import cProfile
+import threading
+import hashlib
+import traceback
+import contextlib
+from typing import List, Tuple, Set, Dict, Iterator, TextIO
 from enum import Enum
 import argparse
 import subprocess
@@ -48,13 +62,105 @@ class Env:
 
 
 class Hdl:
+    # primary units declared by a design file
+    _DECLARES = re.compile(r'^\s*(?:entity|package|configuration|context)\s+(\w+)\s+is\b', re.IGNORECASE | re.MULTILINE)
+    # selected names from use clauses and direct instantiations
+    _SELECTS = re.compile(r'\b(?:use|entity|configuration|context)\s+(\w+)\.(\w+)', re.IGNORECASE)
+    # secondary units refer to their primary unit in the same library
+    _SECONDARY = re.compile(r'\b(?:architecture\s+\w+\s+of|package\s+body)\s+(\w+)', re.IGNORECASE)
+
     def __init__(self, lib: str, path: str):
         self.lib = lib
         self.path = path
+        # the earlier design files this file must be analyzed after
+        self.deps: List[Hdl] = []
+        # digest of the file contents
+        self.hash: str = None
+        pass
+
+
+    def scan(self) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        '''
+        Reads the design file for the primary units it declares and the
+        `(library, unit)` names it references.
+        '''
+        with open(self.path, 'r') as f:
+            text = re.sub(r'--.*', '', f.read())
+        lib = self.lib.lower()
+        declares = set(name.lower() for name in Hdl._DECLARES.findall(text))
+        refs = set()
+        for (prefix, name) in Hdl._SELECTS.findall(text):
+            prefix = prefix.lower()
+            refs.add((lib if prefix == 'work' else prefix, name.lower()))
+        for name in Hdl._SECONDARY.findall(text):
+            refs.add((lib, name.lower()))
+        return (declares, refs)
+
+
+    @staticmethod
+    def link(order: list):
+        '''
+        Sets the dependencies of each design file in the blueprint `order` to
+        the latest earlier files that declare a unit it references.
+        '''
+        declared = dict()
+        item: Hdl
+        for item in order:
+            (declares, refs) = item.scan()
+            item.deps = []
+            for ref in refs:
+                dep = declared.get(ref)
+                if dep is not None and dep is not item and dep not in item.deps:
+                    item.deps += [dep]
+            for name in declares:
+                declared[(item.lib.lower(), name)] = item
         pass
     pass
 
 
+class Cache:
+    '''
+    Persistent key-value data saved as JSON in the build directory.
+    '''
+
+    def __init__(self, path: str):
+        self._path = path
+        self._data = dict()
+        try:
+            with open(path, 'r') as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            # a missing or corrupt cache is treated as empty
+            pass
+        pass
+
+
+    def get(self, key: str, default=None):
+        return self._data.get(key, default)
+
+
+    def set(self, key: str, value):
+        self._data[key] = value
+        pass
+
+
+    def save(self):
+        with open(self._path, 'w') as f:
+            json.dump(self._data, f, indent=2)
+        pass
+
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        '''Computes the sha256 digest of the contents of the file at `path`.'''
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(2**16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    pass
+
+
 class Rule:
     def __init__(self, fileset, identifier, path):
         self.fileset = fileset
@@ -139,10 +245,98 @@ class Status(Enum):
     pass
 
 
+class Timings:
+    '''
+    Wall-clock and CPU time of each phase of a run, along with the resources
+    used by the child processes launched during the phase.
+    '''
+
+    _lock = threading.Lock()
+    # phases currently being timed (innermost last)
+    _open: List[dict] = []
+
+    def __init__(self):
+        self._phases: List[dict] = []
+        self._start = time.time()
+        pass
+
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        '''
+        Times the code run within the context as the phase `name`.
+        '''
+        entry = {
+            'phase': name,
+            'wall': 0.0,
+            'cpu': 0.0,
+            'children': {'count': 0, 'user': 0.0, 'sys': 0.0, 'max_rss_kb': 0},
+        }
+        with Timings._lock:
+            Timings._open.append(entry)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield entry
+        finally:
+            entry['wall'] = time.perf_counter() - wall
+            entry['cpu'] = time.process_time() - cpu
+            with Timings._lock:
+                Timings._open.remove(entry)
+            self._phases += [entry]
+        pass
+
+
+    @staticmethod
+    def add_child(usage):
+        '''
+        Adds the resource usage of a finished child process to the innermost
+        phase being timed.
+        '''
+        with Timings._lock:
+            if len(Timings._open) == 0:
+                return
+            children = Timings._open[-1]['children']
+            children['count'] += 1
+            children['user'] += usage.ru_utime
+            children['sys'] += usage.ru_stime
+            children['max_rss_kb'] = max(children['max_rss_kb'], usage.ru_maxrss)
+        pass
+
+
+    def save(self, path: str, **info):
+        '''
+        Writes the timed phases to `path` as JSON, along with any extra `info`
+        about the run.
+        '''
+        data = dict(info)
+        data['started'] = self._start
+        data['total'] = sum(entry['wall'] for entry in self._phases)
+        data['phases'] = self._phases
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        pass
+    pass
+
+
 class Command:
     def __init__(self, command: str):
         self._command = command
         self._args = []
+        self._cwd = None
+        # the running child process (if any)
+        self._child: subprocess.Popen = None
+        # the child leads its own process group that is killed as a whole
+        self._group = False
+        # results of the latest run
+        self.status: Status = None
+        self.timed_out = False
+
+
+    def cwd(self, path: str):
+        # run the command from the directory `path` (if set)
+        self._cwd = path
+        return self
 
 
     def args(self, args: List[str]):
@@ -158,36 +352,243 @@ class Command:
         return self
     
 
-    def spawn(self, verbose: bool=False) -> Status:
+    @staticmethod
+    def _reap(child: subprocess.Popen) -> int:
+        '''
+        Waits for the `child` process to exit, recording its resource usage
+        where the platform supports it.
+        '''
+        if hasattr(os, 'wait4') == False:
+            return child.wait()
+        (_, status, usage) = os.wait4(child.pid, 0)
+        child.returncode = os.waitstatus_to_exitcode(status)
+        Timings.add_child(usage)
+        return child.returncode
+
+
+    def _display(self):
+        command_line = self._command
+        for c in self._args:
+            command_line += ' ' + Env.quote_str(c)
+        print('info:', command_line)
+        pass
+
+
+    def _watch(self, timeout: float) -> threading.Timer:
+        '''
+        Starts a timer that kills the running child after `timeout` seconds
+        (if set).
+        '''
+        self.timed_out = False
+        if timeout is None:
+            return None
+        def expire():
+            self.timed_out = True
+            self.cancel()
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.daemon = True
+        watchdog.start()
+        return watchdog
+
+
+    def _finish(self, child: subprocess.Popen, watchdog: threading.Timer) -> Status:
+        status = Command._reap(child)
+        if watchdog is not None:
+            watchdog.cancel()
+        self._child = None
+        self.status = Status.FAIL if self.timed_out == True else Status.from_int(status)
+        return self.status
+
+
+    def cancel(self):
+        '''
+        Kills the child process of the command if it is still running.
+        '''
+        child = self._child
+        if child is None or child.returncode is not None:
+            return
+        if hasattr(os, 'wait4') == True:
+            # signal the pid directly since polling here would race `_reap`
+            try:
+                if self._group == True:
+                    os.killpg(child.pid, signal.SIGKILL)
+                else:
+                    os.kill(child.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            child.kill()
+        pass
+
+
+    def spawn(self, verbose: bool=False, timeout: float=None) -> Status:
+        '''
+        Runs the command attached to the terminal, killing it after `timeout`
+        seconds (if set).
+        '''
         job = [self._command] + self._args
         if verbose == True:
-            command_line = self._command
-            for c in self._args:
-                command_line += ' ' + Env.quote_str(c)
-            print('info:', command_line)
-        child = subprocess.Popen(job)
-        status = child.wait()
-        return Status.from_int(status)
-    
-
-    def output(self, verbose: bool=False) -> Tuple[str, Status]:
+            self._display()
+        self._group = False
+        self._child = subprocess.Popen(job, cwd=self._cwd)
+        watchdog = self._watch(timeout)
+        return self._finish(self._child, watchdog)
+
+
+    def stream(self, log: TextIO=None, timeout: float=None, verbose: bool=False) -> Iterator[str]:
+        '''
+        Runs the command and yields each line of its combined stdout and stderr
+        as soon as it is written, copying the lines to `log` (if set).
+
+        The command is killed once it runs longer than `timeout` seconds (if
+        set), when `cancel` is called, or when the generator is closed early.
+        Its exit status is stored in `status` after the last line.
+        '''
         job = [self._command] + self._args
-        # display the command being executed
         if verbose == True:
-            command_line = self._command
-            for c in self._args:
-                command_line += ' ' + Env.quote_str(c)
-            print('info:', command_line)
+            self._display()
+        self.status = None
+        # grandchildren holding the pipe open must be killed with the child
+        self._group = hasattr(os, 'killpg')
+        try:
+            child = subprocess.Popen(job, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self._cwd, text=True, errors='replace', bufsize=1, start_new_session=self._group)
+        except FileNotFoundError:
+            print('error: command not found: \"'+self._command+'\"')
+            self.status = Status.FAIL
+            return
+        self._child = child
+        watchdog = self._watch(timeout)
+        done = False
+        try:
+            for line in child.stdout:
+                if log is not None:
+                    log.write(line)
+                yield line
+            done = True
+        finally:
+            child.stdout.close()
+            if done == False:
+                self.cancel()
+            self._finish(child, watchdog)
+        pass
+
+
+    def tee(self, log: TextIO=None, timeout: float=None, verbose: bool=False) -> Status:
+        '''
+        Runs the command with its output written to `log` as it arrives,
+        without keeping the output in memory.
+        '''
+        for _ in self.stream(log, timeout, verbose):
+            pass
+        return self.status
+
+
+    def output(self, verbose: bool=False, timeout: float=None) -> Tuple[str, Status]:
         # execute the command and capture channels for stdout and stderr
+        out = ''.join(self.stream(timeout=timeout, verbose=verbose))
+        return (out, self.status)
+
+
+    async def run_async(self, log: TextIO=None, timeout: float=None) -> Tuple[str, Status]:
+        '''
+        Runs the command from an asyncio event loop, returning its combined
+        stdout and stderr along with its status. Lines are also written to `log`
+        (if set) as they arrive.
+
+        The command is killed after `timeout` seconds (if set) or when the
+        awaiting task is cancelled.
+        '''
         try:
-            pipe = subprocess.Popen(job, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            proc = await asyncio.create_subprocess_exec(self._command, *self._args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, cwd=self._cwd, start_new_session=hasattr(os, 'killpg'))
         except FileNotFoundError:
             print('error: command not found: \"'+self._command+'\"')
             return ('', Status.FAIL)
-        out, err = pipe.communicate()
-        if err is not None:
-            return (err.decode('utf-8'), Status.FAIL)
-        if out is not None:
-            return (out.decode('utf-8'), Status.OKAY)
-        return ('', Status.OKAY)
-    pass
\ No newline at end of file
+        lines = []
+
+        async def collect() -> int:
+            async for raw in proc.stdout:
+                line = raw.decode('utf-8', errors='replace')
+                if log is not None:
+                    log.write(line)
+                lines.append(line)
+            return await proc.wait()
+
+        self.timed_out = False
+        try:
+            code = await asyncio.wait_for(collect(), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            code = None
+        finally:
+            if proc.returncode is None:
+                if hasattr(os, 'killpg') == True:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+                await proc.wait()
+        self.status = Status.FAIL if code is None else Status.from_int(code)
+        return (''.join(lines), self.status)
+    pass
+
+
+class Model:
+    '''
+    Runs a Python design model inside the current interpreter instead of a
+    fresh one launched by `verb model`.
+
+    Modules imported by the model stay loaded between runs from the same
+    interpreter, except for verb's own modules, which are reloaded so they
+    read the context of each run from the environment.
+    '''
+
+    def __init__(self, path: str):
+        self._path = os.path.abspath(path)
+        pass
+
+
+    def run(self, workdir: str, env: Dict[str, str], seed: int=None, profile: str=None) -> Tuple[str, Status]:
+        '''
+        Executes the model as `__main__` from `workdir` with the variables `env`
+        set, returning its captured output and exit status.
+
+        The model runs under cProfile with its stats saved to `profile` (if set).
+        '''
+        saved_env = {key: os.environ.get(key) for key in env}
+        saved_cwd = os.getcwd()
+        out = io.StringIO()
+        status = Status.OKAY
+        os.environ.update({key: str(val) for (key, val) in env.items() if val is not None})
+        for name in [name for name in sys.modules if name == 'verb' or name.startswith('verb.')]:
+            del sys.modules[name]
+        root = os.path.dirname(self._path)
+        if root not in sys.path:
+            sys.path.insert(0, root)
+        if seed is not None:
+            random.seed(seed)
+        profiler = cProfile.Profile() if profile is not None else None
+        try:
+            os.chdir(workdir)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    runpy.run_path(self._path, run_name='__main__')
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                        profiler.dump_stats(profile)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                status = Status.FAIL
+        except Exception:
+            out.write(traceback.format_exc())
+            status = Status.FAIL
+        finally:
+            os.chdir(saved_cwd)
+            for (key, val) in saved_env.items():
+                if val is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = val
+        return (out.getvalue(), status)
+    pass
@@ -0,0 +1,369 @@
+# File: bench.py
+# Details:
+#   Benchmarks the encode and decode paths of the hamming model and tracks
+#   their performance against a stored baseline.
+#
+#   Every case runs one operation of one path over a fixed set of random
+#   blocks for a range of PARITY_BITS:
+#
+#       list   - `HammingCode.encode` / `decode` on lists of bits
+#       int    - `HammingCode.encode_int` / `decode_int` on packed integers
+#       lookup - `HammingCode.decode_int` with the syndrome lookup table (only
+#                for codes with at most `LOOKUP_LIMIT` parity bits)
+#       batch  - `HammingCode.encode_batch` / `decode_batch` on numpy arrays
+#       block  - `HammingCode.encode` / `decode` on `Block`s wrapping bytes
+#       bytes  - `HammingCode.encode_bytes` / `decode_bytes` on packed bytes
+#       send   - `send` over a noisy channel on lists of bits
+#
+#   Decoding and sending are measured for each error mix:
+#
+#       clean  - no bits flipped
+#       single - 1 bit flipped per block
+#       double - 2 bits flipped per block
+#       mixed  - 0, 1, or 2 bits flipped per block
+#
+#   Each case reports its throughput (blocks/s and MB/s of data bits) from
+#   untimed repetitions, per-call latency percentiles from a separate timed
+#   pass, and the peak memory allocated during one pass (via tracemalloc).
+#   The list paths work in place, so their calls include copying the input.
+#   The batch path makes one call per pass over all blocks.
+#
+#   The import time of the model and each of its backends is measured in
+#   fresh interpreters with `python -X importtime`, reporting the median
+#   cumulative time of the module and the number of modules the interpreter
+#   loaded.
+#
+#   Usage: `python bench.py -p 2 3 4 --output results.json`
+#
+#   Compare against a baseline and exit with an error on any case (or import)
+#   that is slower by more than the threshold:
+#
+#       `python bench.py --compare baseline.json --threshold 0.1`
+#
+#   Unit tests are in `test_bench.py`; run: `python -m unittest test_bench.py`.
+#
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Tuple, Callable
+import numpy as np
+
+import hamming
+from hamming import HammingCode, Block
+
+PATHS = ['list', 'int', 'lookup', 'block', 'batch', 'bytes', 'send']
+
+# number of bits flipped in a block for each error mix
+MIXES = {
+    'clean': [0],
+    'single': [1],
+    'double': [2],
+    'mixed': [0, 1, 2],
+}
+
+# fields identifying the same case across runs
+KEY = ['op', 'path', 'parity_bits', 'mix']
+
+# modules whose import time is tracked
+MODULES = ['hamming', 'hamming_batch', 'hamming_parallel']
+
+
+def percentile(samples: List[float], q: float) -> float:
+    '''
+    Returns the `q`-th percentile of `samples` (nearest rank).
+    '''
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered)-1, int(round(q/100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _flips(mix: str, t_bits: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    '''
+    Returns an (n, t_bits) array of error masks for the error `mix`.
+    '''
+    counts = rng.choice(MIXES[mix], size=n)
+    masks = np.zeros((n, t_bits), dtype=np.uint8)
+    for (row, k) in enumerate(counts):
+        masks[row, rng.choice(t_bits, size=k, replace=False)] = 1
+    return masks
+
+
+def _pack(rows: np.ndarray) -> List[int]:
+    '''
+    Packs each row of bits into an integer where column `i` is bit `i`.
+    '''
+    weights = [1 << i for i in range(0, rows.shape[1])]
+    return [sum(w for (w, b) in zip(weights, row) if b) for row in rows.tolist()]
+
+
+def _case(op: str, path: str, code: HammingCode, mix: str, n: int, rng: np.random.Generator) -> Tuple[Callable, list]:
+    '''
+    Prepares the function and inputs measured by one case. Calling the function
+    on every input performs one pass over the `n` blocks.
+    '''
+    messages = rng.integers(0, 2, size=(n, code.get_data_bits_len()), dtype=np.uint8)
+    blocks = code.encode_batch(messages)
+    if op != 'encode':
+        blocks ^= _flips(mix, code.get_total_bits_len(), n, rng)
+    if path == 'send':
+        noise = [int(k) for k in rng.choice(MIXES[mix], size=n)]
+        items = list(zip(blocks.tolist(), noise))
+        return (lambda x: hamming.send(x[0].copy(), noise=x[1]), items)
+    if path == 'list':
+        if op == 'encode':
+            return (lambda x: code.encode(x.copy()), messages.tolist())
+        return (lambda x: code.decode(x.copy()), blocks.tolist())
+    if path in ['int', 'lookup']:
+        if op == 'encode':
+            return (code.encode_int, _pack(messages))
+        return (code.decode_int, _pack(blocks))
+    if path == 'block':
+        if op == 'encode':
+            d_bits = code.get_data_bits_len()
+            return (lambda x: code.encode(Block.from_bytes(x, d_bits)), [x.to_bytes((d_bits+7) // 8, 'little') for x in _pack(messages)])
+        t_bits = code.get_total_bits_len()
+        return (lambda x: code.decode(Block.from_bytes(x, t_bits)), [x.to_bytes((t_bits+7) // 8, 'little') for x in _pack(blocks)])
+    if path == 'batch':
+        if op == 'encode':
+            return (code.encode_batch, [messages])
+        return (code.decode_batch, [blocks])
+    if path == 'bytes':
+        data = np.packbits(messages.reshape(-1), bitorder='little').tobytes()
+        if op == 'encode':
+            return (code.encode_bytes, [data])
+        return (code.decode_bytes, [np.packbits(blocks.reshape(-1), bitorder='little').tobytes()])
+    raise ValueError('unknown path: '+path)
+
+
+def run_case(op: str, path: str, parity_bits: int, mix: str, n: int=1000, min_time: float=0.2, seed=None) -> Dict:
+    '''
+    Measures one operation of one path over `n` random blocks for at least
+    `min_time` seconds. The number of blocks is rounded up to a multiple of 8
+    so the bytes path packs into whole groups.
+    '''
+    n = (n + 7) // 8 * 8
+    code = HammingCode(parity_bits, lookup=(path == 'lookup'))
+    rng = np.random.default_rng(seed)
+    (fn, items) = _case(op, path, code, mix, n, rng)
+    # throughput over whole passes without timing each call
+    passes = 0
+    start = time.perf_counter()
+    while True:
+        for x in items:
+            fn(x)
+        passes += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    # latency of each call over one pass
+    latencies = []
+    for x in items:
+        t0 = time.perf_counter()
+        fn(x)
+        latencies += [time.perf_counter() - t0]
+    # peak memory allocated over one pass
+    tracemalloc.start()
+    for x in items:
+        fn(x)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = passes * n
+    return {
+        'op': op,
+        'path': path,
+        'parity_bits': parity_bits,
+        'mix': mix,
+        'blocks': blocks,
+        'seconds': elapsed,
+        'blocks_per_s': blocks / elapsed,
+        'mb_per_s': blocks * code.get_data_bits_len() / 8 / 1e6 / elapsed,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p90_us': percentile(latencies, 90) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+        'peak_kb': peak / 1024,
+    }
+
+
+def import_time(module: str, runs: int=5) -> Dict:
+    '''
+    Measures importing `module` in `runs` fresh interpreters with
+    `-X importtime`.
+    '''
+    times = []
+    for _ in range(0, runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import '+module],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+        )
+        # rows are 'import time: self | cumulative | name', where the module
+        # itself is the last top-level row
+        rows = [line.split('|') for line in proc.stderr.splitlines() if line.startswith('import time:')][1:]
+        loaded = [(int(row[1]), row[2].strip()) for row in rows]
+        times += [[us for (us, name) in loaded if name == module][-1]]
+    return {
+        'module': module,
+        'us': statistics.median(times),
+        'min_us': min(times),
+        'modules': len(loaded),
+    }
+
+
+def cases(paths: List[str], parity_bits: List[int], mixes: List[str]) -> List[Tuple[str, str, int, str]]:
+    '''
+    Lists every `(op, path, parity_bits, mix)` case to run. Encoding does not
+    depend on the error mix, so it runs once per path and size. The lookup
+    path only decodes.
+    '''
+    out = []
+    for p in parity_bits:
+        for path in paths:
+            if path == 'lookup':
+                if p <= hamming.LOOKUP_LIMIT:
+                    out += [('decode', path, p, mix) for mix in mixes]
+                continue
+            if path == 'send':
+                out += [('send', path, p, mix) for mix in mixes]
+                continue
+            out += [('encode', path, p, 'none')]
+            out += [('decode', path, p, mix) for mix in mixes]
+    return out
+
+
+def run(paths: List[str]=PATHS, parity_bits: List[int]=list(range(2, 11)), mixes: List[str]=list(MIXES), n: int=1000, min_time: float=0.2, seed=None, log=None, import_runs: int=5) -> Dict:
+    '''
+    Runs every case and measures the import time of `MODULES` (unless
+    `import_runs` is 0). Returns the results along with details of the machine
+    they were measured on.
+    '''
+    random.seed(seed)
+    results = []
+    for (op, path, p, mix) in cases(paths, parity_bits, mixes):
+        result = run_case(op, path, p, mix, n, min_time, seed)
+        if log is not None:
+            print('info:', format_row(result), file=log)
+        results += [result]
+    imports = []
+    if import_runs > 0:
+        for module in MODULES:
+            imports += [import_time(module, import_runs)]
+            if log is not None:
+                print('info: import {:<16} {:>9.2f} ms ({} modules)'.format(module, imports[-1]['us'] / 1e3, imports[-1]['modules']), file=log)
+    return {
+        'meta': {
+            'time': time.time(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'blocks': n,
+            'min_time': min_time,
+            'seed': seed,
+        },
+        'results': results,
+        'imports': imports,
+    }
+
+
+def format_row(result: Dict) -> str:
+    return '{:<6} {:<5} p={:<2} {:<6} {:>12.0f} blocks/s {:>9.2f} MB/s  p50 {:>9.2f} us  p99 {:>9.2f} us  peak {:>9.1f} KiB'.format(
+        result['op'], result['path'], result['parity_bits'], result['mix'],
+        result['blocks_per_s'], result['mb_per_s'], result['p50_us'], result['p99_us'], result['peak_kb'],
+    )
+
+
+def compare(current: Dict, baseline: Dict, threshold: float=0.1) -> List[Dict]:
+    '''
+    Matches each case of `current` to the same case in `baseline` and returns
+    the comparisons, where `regressed` marks a drop in throughput by more than
+    the fraction `threshold`.
+    '''
+    previous = {tuple(r[k] for k in KEY): r for r in baseline['results']}
+    out = []
+    for r in current['results']:
+        base = previous.get(tuple(r[k] for k in KEY))
+        if base is None:
+            continue
+        change = r['blocks_per_s'] / base['blocks_per_s'] - 1
+        out += [{
+            'case': r,
+            'baseline': base['blocks_per_s'],
+            'change': change,
+            'regressed': change < -threshold,
+        }]
+    return out
+
+
+def compare_imports(current: Dict, baseline: Dict, threshold: float=0.1) -> List[Dict]:
+    '''
+    Matches each import time of `current` to the same module in `baseline`,
+    where `regressed` marks a rise in time by more than the fraction
+    `threshold`.
+    '''
+    previous = {r['module']: r for r in baseline.get('imports', [])}
+    out = []
+    for r in current.get('imports', []):
+        base = previous.get(r['module'])
+        if base is None:
+            continue
+        change = r['us'] / base['us'] - 1
+        out += [{
+            'case': r,
+            'baseline': base['us'],
+            'change': change,
+            'regressed': change > threshold,
+        }]
+    return out
+
+
+def main(argv: List[str]=None):
+    parser = argparse.ArgumentParser(prog='bench', description='Benchmark the hamming-code model paths')
+    parser.add_argument('--parity-bits', '-p', type=int, nargs='+', default=list(range(2, 11)), metavar='NUM', help='numbers of parity bits (default: 2 to 10)')
+    parser.add_argument('--paths', nargs='+', choices=PATHS, default=PATHS, help='paths to measure (default: all)')
+    parser.add_argument('--mixes', nargs='+', choices=list(MIXES), default=list(MIXES), help='error mixes to decode (default: all)')
+    parser.add_argument('--blocks', '-n', type=int, default=1000, metavar='NUM', help='number of blocks per pass (rounded up to a multiple of 8)')
+    parser.add_argument('--min-time', type=float, default=0.2, metavar='SECONDS', help='minimum time to measure throughput per case')
+    parser.add_argument('--seed', type=int, default=0, help='set the randomness seed')
+    parser.add_argument('--import-runs', type=int, default=5, metavar='NUM', help='interpreters started to time imports (0 to skip)')
+    parser.add_argument('--output', '-o', default=None, help='JSON file to save the results to')
+    parser.add_argument('--compare', default=None, metavar='BASELINE', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, metavar='FRAC', help='slowdown that counts as a regression (default: 0.1)')
+    args = parser.parse_args(argv)
+
+    current = run(args.paths, args.parity_bits, args.mixes, args.blocks, args.min_time, args.seed, log=sys.stderr, import_runs=args.import_runs)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        comparisons = compare(current, baseline, args.threshold)
+        for c in comparisons:
+            r = c['case']
+            flag = 'REGRESSED' if c['regressed'] == True else ''
+            print('{:<6} {:<5} p={:<2} {:<6} {:>12.0f} -> {:>12.0f} blocks/s {:>+8.1%} {}'.format(
+                r['op'], r['path'], r['parity_bits'], r['mix'], c['baseline'], r['blocks_per_s'], c['change'], flag,
+            ))
+        imports = compare_imports(current, baseline, args.threshold)
+        for c in imports:
+            r = c['case']
+            flag = 'REGRESSED' if c['regressed'] == True else ''
+            print('import {:<16} {:>9.2f} -> {:>9.2f} ms {:>+8.1%} {}'.format(r['module'], c['baseline'] / 1e3, r['us'] / 1e3, c['change'], flag))
+        comparisons += imports
+        regressions = [c for c in comparisons if c['regressed'] == True]
+        print('info:', len(regressions), 'of', len(comparisons), 'cases regressed by more than', format(args.threshold, '.0%'))
+        if len(regressions) > 0:
+            sys.exit(1)
+    pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# File: bulk.py
+# Details:
+#   Helpers for generating test vectors in bulk from the design models.
+#
+#   Models sample and evaluate whole batches of vectors with numpy and only
+#   hand the finished rows to verb's `vectors` writers, which keeps the vector
+#   file format owned by verb.
+#
+#   Writing the vector files in large chunks is out of scope: the rows are
+#   parsed by the `drive`/`load` procedures that verb generates for each
+#   testbench, so a writer outside of verb would duplicate (and could drift
+#   from) that format. Each row is still pushed through `vectors().push()`.
+#
+import os
+import random
+from typing import Iterator
+import numpy as np
+
+# environment variable exported by gverb with its `--loop-limit`
+LOOP_LIMIT_VAR = 'GVERB_LOOP_LIMIT'
+
+# number of vectors used when the model runs outside of gverb
+DEFAULT_LOOP_LIMIT = 1000
+
+# number of vectors sampled and evaluated at once
+BATCH_SIZE = 2**14
+
+
+def loop_limit(default: int=DEFAULT_LOOP_LIMIT) -> int:
+    '''
+    Returns the number of test vectors to generate.
+    '''
+    value = os.environ.get(LOOP_LIMIT_VAR)
+    if value is None or len(value) == 0:
+        return default
+    return int(value)
+
+
+def rng() -> np.random.Generator:
+    '''
+    Returns a numpy generator seeded from Python's `random` module, so runs
+    are reproducible under verb's `--seed`.
+    '''
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def batches(total: int, size: int=BATCH_SIZE) -> Iterator[int]:
+    '''
+    Splits `total` vectors into batches of at most `size` vectors.
+    '''
+    for i in range(0, total, size):
+        yield min(size, total-i)
+    pass
+
+
+def bits(row: np.ndarray) -> list:
+    '''
+    Converts a row of bits (index 0 is the LSB) into an MSB-first list for a
+    `Signal`.
+    '''
+    return row[::-1].tolist()
+
+
+def pack(row: np.ndarray) -> int:
+    '''
+    Packs a row of bits (index 0 is the LSB) into an integer.
+    '''
+    return int.from_bytes(np.packbits(row, bitorder='little').tobytes(), 'little')
+
+
+def int_bits(value: int, width: int) -> list:
+    '''
+    Converts the lowest `width` bits of `value` into an MSB-first list for a
+    `Signal`.
+    '''
+    return [(value >> i) & 1 for i in range(width-1, -1, -1)]
@@ -0,0 +1,92 @@
+# File: channel.py
+# Details:
+#   Vectorized noisy channel models for batches of hamming-code blocks.
+#
+#   Each model takes an array of N encoded blocks with shape (N, TOTAL_BITS)
+#   (as returned by `HammingCode.encode_batch`) and flips bits for every block
+#   in a single pass. The models return the received blocks along with the
+#   flip masks so callers can verify the decoder results.
+#
+#   Randomness comes from a `numpy.random.Generator`; pass an existing
+#   generator or an integer seed as `rng` for reproducible runs.
+#
+#   Arrays are built in memory for all N blocks, so split very large runs
+#   (10**7+ blocks) into batches of about 10**6 blocks.
+#
+#   Unit tests are in `test_channel.py`; run: `python -m unittest test_channel.py`.
+#
+from typing import Tuple
+import numpy as np
+
+
+def _rng(rng) -> np.random.Generator:
+    '''
+    Returns a generator for `rng`, which may be a generator, a seed, or `None`.
+    '''
+    return np.random.default_rng(rng)
+
+
+def apply(blocks: np.ndarray, masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Flips the bits of `blocks` set in `masks`.
+
+    Returns `(received, masks)`.
+    '''
+    return (np.bitwise_xor(blocks, masks, dtype=np.uint8), masks)
+
+
+def flip(blocks: np.ndarray, k, rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Flips exactly `k` distinct bits in each block.
+
+    `k` is either a single count for every block or an array with a count for
+    each block (such as `rng.integers(0, 3, N)` for 0, 1, or 2 flips).
+
+    Returns `(received, masks)`.
+    '''
+    rng = _rng(rng)
+    (n, width) = blocks.shape
+    k = np.broadcast_to(np.asarray(k, dtype=np.intp), (n,))
+    if np.any(k < 0) or np.any(k > width):
+        raise ValueError('number of flips must be between 0 and '+str(width))
+    # the first k positions of a random permutation of each row are distinct
+    most = int(k.max()) if n > 0 else 0
+    order = np.argsort(rng.random((n, width), dtype=np.float32), axis=1)[:, :most]
+    masks = np.zeros((n, width), dtype=np.uint8)
+    np.put_along_axis(masks, order, (np.arange(0, most) < k[:, None]).astype(np.uint8), axis=1)
+    return apply(blocks, masks)
+
+
+def bsc(blocks: np.ndarray, p: float, rng=None) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Binary symmetric channel that flips every bit independently with
+    probability `p`.
+
+    Returns `(received, masks)`.
+    '''
+    if p < 0.0 or p > 1.0:
+        raise ValueError('bit-error rate must be between 0 and 1')
+    rng = _rng(rng)
+    masks = (rng.random(blocks.shape, dtype=np.float32) < p).astype(np.uint8)
+    return apply(blocks, masks)
+
+
+def burst(blocks: np.ndarray, length: int, rng=None, density: float=0.5) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Flips one burst of `length` bits at a random position in each block.
+
+    The first and last bits of a burst are always flipped; the bits between
+    them are flipped independently with probability `density`.
+
+    Returns `(received, masks)`.
+    '''
+    rng = _rng(rng)
+    (n, width) = blocks.shape
+    if length < 1 or length > width:
+        raise ValueError('burst length must be between 1 and '+str(width))
+    start = rng.integers(0, width-length+1, size=(n, 1))
+    cols = np.arange(0, width)
+    inside = (cols > start) & (cols < start+length-1)
+    edges = (cols == start) | (cols == start+length-1)
+    masks = (edges | (inside & (rng.random((n, width), dtype=np.float32) < density))).astype(np.uint8)
+    return apply(blocks, masks)
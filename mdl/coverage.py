@@ -0,0 +1,106 @@
+# File: coverage.py
+# Details:
+#   Directed error-coverage stimulus for the decoder testbench models.
+#
+#   `directed_errors` enumerates error patterns (tuples of bit positions to
+#   flip) that each cover a new class tracked by an `ErrorCoverage`: the
+#   error-free block, every single-bit position, every syndrome reachable by
+#   3-bit and 4-bit errors, and every double-bit pair. Apply the patterns to
+#   encoded blocks with `channel.apply`.
+#
+#   Unit tests are in `test_coverage.py`; run: `python -m unittest test_coverage.py`.
+#
+from typing import Dict, Iterator, Set, Tuple
+import numpy as np
+
+
+# random draws per class when sampling 3-bit and 4-bit error patterns
+SAMPLE_TRIES = 64
+
+
+def reachable_syndromes(total_bits: int, count: int) -> Set[int]:
+    '''
+    Returns every syndrome (the XOR of the flipped positions) produced by
+    flipping exactly `count` distinct bits of a block with `total_bits` bits.
+    '''
+    # reach[j] holds the syndromes of j distinct positions among those seen
+    reach = [{0}] + [set() for _ in range(0, count)]
+    for x in range(0, total_bits):
+        for j in range(count, 0, -1):
+            reach[j] |= {s ^ x for s in reach[j-1]}
+    return reach[count]
+
+
+class ErrorCoverage:
+    '''
+    Tracks which classes of error patterns have been sent to the decoder.
+
+    Classes are the error-free block, each single-bit position, each
+    double-bit pair, and the decoder outcome (overall parity and syndrome)
+    of 3-bit and 4-bit patterns. The overall parity of a pattern is set by its
+    number of bits, so those classes are keyed by syndrome alone and their
+    goals are the syndromes a block of `total_bits` bits can reach.
+    '''
+
+    def __init__(self, total_bits: int):
+        self.goals = {
+            'clean': 1,
+            'single': total_bits,
+            'double': total_bits*(total_bits-1) // 2,
+            'triple': len(reachable_syndromes(total_bits, 3)),
+            'quad': len(reachable_syndromes(total_bits, 4)),
+        }
+        self.covered: Dict[str, set] = {kind: set() for kind in self.goals}
+
+    def cover(self, kind: str, key) -> bool:
+        '''
+        Marks the class `key` of `kind` as covered. Returns `False` if it was
+        already covered.
+        '''
+        if key in self.covered[kind]:
+            return False
+        self.covered[kind].add(key)
+        return True
+
+    def is_complete(self, kind: str) -> bool:
+        '''
+        Checks if every class of `kind` is covered.
+        '''
+        return len(self.covered[kind]) >= self.goals[kind]
+
+    def __str__(self) -> str:
+        return ', '.join(kind+' '+str(len(self.covered[kind]))+'/'+str(goal) for (kind, goal) in self.goals.items())
+
+
+def directed_errors(total_bits: int, coverage: ErrorCoverage, rng=None) -> Iterator[Tuple[int, ...]]:
+    '''
+    Enumerates error patterns as tuples of bit positions to flip, only yielding
+    patterns that cover a new class.
+
+    The small classes come first so a limited number of vectors still hits
+    every single-bit position and every decoder outcome.
+    '''
+    rng = np.random.default_rng(rng)
+    if coverage.cover('clean', ()):
+        yield ()
+    for i in range(0, total_bits):
+        if coverage.cover('single', i):
+            yield (i,)
+    # sample multi-bit patterns, keyed by the syndrome they produce
+    for (kind, count) in [('triple', 3), ('quad', 4)]:
+        if count > total_bits:
+            continue
+        for _ in range(0, SAMPLE_TRIES*total_bits):
+            if coverage.is_complete(kind) == True:
+                break
+            spots = tuple(int(x) for x in rng.choice(total_bits, size=count, replace=False))
+            syndrome = 0
+            for s in spots:
+                syndrome ^= s
+            if coverage.cover(kind, syndrome):
+                yield spots
+    for i in range(0, total_bits):
+        for j in range(i+1, total_bits):
+            if coverage.cover('double', (i, j)):
+                yield (i, j)
+    pass
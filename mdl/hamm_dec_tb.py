@@ -1,45 +1,75 @@
-from hamming import HammingCode, send
-import random
+from hamming import HammingCode
+import channel
+from coverage import ErrorCoverage, directed_errors
+import bulk
+import numpy as np
+from typing import Iterator, Tuple
 from verb.model import *
 from verb import context
 
 class HammDec:
 
-    def __init__(self, parity_bits: int):
+    def __init__(self, parity_bits: int, data_bits: int=0):
         self.parity_bits = parity_bits
-        self._code = HammingCode(parity_bits=parity_bits)
+        # a DATA_BITS of 0 selects the full block
+        self._code = HammingCode(parity_bits=parity_bits, data_bits=data_bits if data_bits > 0 else None)
 
         self.encoding = Signal(self._code.get_total_bits_len())
         self.message = Signal(self._code.get_data_bits_len())
         self.corrected = Signal()
         self.valid = Signal()
 
-    def setup(self):
-        message = Signal(self._code.get_data_bits_len())
-        message.sample()
-        
-        encoding = self._code.encode(message.get(list)[::-1])
-        # choose some bits to flip (or none) by injecting noise
-        packet = send(encoding, noise=random.randint(0, 4), spots=[])
+    def setup(self, rng, n: int, errors: Iterator[Tuple[int, ...]]=None):
+        messages = rng.integers(0, 2, size=(n, self._code.get_data_bits_len()), dtype='uint8')
 
-        self.encoding.set(packet[::-1])
+        encodings = self._code.encode_batch(messages)
+        if errors is None:
+            # choose some bits to flip (or none) by injecting noise
+            (self._packets, _) = channel.flip(encodings, rng.integers(0, 5, size=n), rng)
+        else:
+            # flip the next error patterns in order
+            masks = np.zeros(encodings.shape, dtype='uint8')
+            for (k, spots) in zip(range(0, n), errors):
+                masks[k, list(spots)] = 1
+            (self._packets, _) = channel.apply(encodings, masks)
 
     def eval(self):
-        decoding, corrected, valid = self._code.decode(self.encoding.get(list)[::-1])
-        self.message.set(decoding[::-1])
-        self.corrected.set(int(corrected))
-        self.valid.set(int(valid))
+        (self._messages, self._corrected, self._valid) = self._code.decode_batch(self._packets)
+
+    def vectors(self):
+        for (k, packet) in enumerate(self._packets):
+            self.encoding.set(bulk.bits(packet))
+            self.message.set(bulk.bits(self._messages[k]))
+            self.corrected.set(int(self._corrected[k]))
+            self.valid.set(int(self._valid[k]))
+            yield
 
 
 def main():
-    mdl = HammDec(context.generic('PARITY_BITS', int))
+    mdl = HammDec(context.generic('PARITY_BITS', int), context.generic('DATA_BITS', int))
+    rng = bulk.rng()
+    total = bulk.loop_limit()
+
+    errors = None
+    if context.generic('DIRECTED', bool) == True:
+        coverage = ErrorCoverage(mdl._code.get_total_bits_len())
+        patterns = list(directed_errors(mdl._code.get_total_bits_len(), coverage, rng))
+        # send every pattern, even past the loop limit, so no class is dropped
+        if len(patterns) > total:
+            print('warning: directed error coverage needs', len(patterns), 'vectors; raising the loop limit from', total)
+        total = len(patterns)
+        errors = iter(patterns)
 
     with vectors('inputs.txt', 'i') as inputs, vectors('outputs.txt', 'o') as outputs:
-        for _ in range(1000):
-            mdl.setup()
-            inputs.push(mdl)
+        for n in bulk.batches(total):
+            mdl.setup(rng, n, errors)
             mdl.eval()
-            outputs.push(mdl)
+            for _ in mdl.vectors():
+                inputs.push(mdl)
+                outputs.push(mdl)
+
+    if errors is not None:
+        print('info: directed error coverage:', coverage)
 
 
 if __name__ == '__main__':
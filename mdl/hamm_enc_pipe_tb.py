@@ -0,0 +1,72 @@
+from hamming import HammingCode, HammingPipeline
+import bulk
+
+from verb.model import *
+from verb import context
+
+# chance of offering a message (`in_valid`) and of taking a block
+# (`out_ready`) in each cycle, so the vectors cover bubbles and stalls
+VALID_RATE = 0.75
+READY_RATE = 0.75
+
+
+class HammEncPipe:
+
+    def __init__(self, parity_bits: int, data_bits: int=0, reg_parity: bool=True, reg_output: bool=True):
+        self.parity_bits = parity_bits
+        # a DATA_BITS of 0 selects the full block
+        self._code = HammingCode(parity_bits=parity_bits, data_bits=data_bits if data_bits > 0 else None)
+        # the pipeline state carries over from one batch of cycles to the next
+        self._pipe = HammingPipeline(self._code, stages=[reg_parity, reg_output])
+
+        self.in_valid = Signal()
+        self.in_ready = Signal()
+        self.message = Signal(self._code.get_data_bits_len())
+        self.out_ready = Signal()
+        self.out_valid = Signal()
+        self.encoding = Signal(self._code.get_total_bits_len())
+
+    def setup(self, rng, n: int):
+        self._messages = rng.integers(0, 2, size=(n, self._code.get_data_bits_len()), dtype='uint8')
+        self._in_valid = rng.random(n) < VALID_RATE
+        self._out_ready = rng.random(n) < READY_RATE
+
+    def eval(self):
+        self._results = [
+            self._pipe.step(bool(v), bulk.pack(m), bool(r)) for (v, m, r) in zip(self._in_valid, self._messages, self._out_ready)
+        ]
+
+    def vectors(self):
+        for (k, (in_ready, out_valid, block)) in enumerate(self._results):
+            self.in_valid.set(int(self._in_valid[k]))
+            self.message.set(bulk.bits(self._messages[k]))
+            self.out_ready.set(int(self._out_ready[k]))
+            self.in_ready.set(int(in_ready))
+            self.out_valid.set(int(out_valid))
+            self.encoding.set(bulk.int_bits(block if out_valid == True else 0, self._code.get_total_bits_len()))
+            yield
+
+
+def main():
+    mdl = HammEncPipe(
+        context.generic('PARITY_BITS', int),
+        context.generic('DATA_BITS', int),
+        context.generic('REG_PARITY', bool),
+        context.generic('REG_OUTPUT', bool),
+    )
+    rng = bulk.rng()
+
+    # each vector is one clock cycle
+    with vectors('inputs.txt', 'i') as inputs, vectors('outputs.txt', 'o') as outputs:
+        for n in bulk.batches(bulk.loop_limit()):
+            mdl.setup(rng, n)
+            mdl.eval()
+            for _ in mdl.vectors():
+                inputs.push(mdl)
+                outputs.push(mdl)
+
+    print('info: pipeline latency:', mdl._pipe.get_latency(), 'cycles, throughput:', format(mdl._pipe.get_throughput(), '.3f'), 'blocks/cycle')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,43 @@
 from hamming import HammingCode
+import bulk
 
 from verb.model import *
 from verb import context
 
 class HammEnc:
 
-    def __init__(self, parity_bits: int):
+    def __init__(self, parity_bits: int, data_bits: int=0):
         self.parity_bits = parity_bits
-        self._code = HammingCode(parity_bits=parity_bits)
+        # a DATA_BITS of 0 selects the full block
+        self._code = HammingCode(parity_bits=parity_bits, data_bits=data_bits if data_bits > 0 else None)
 
         self.message = Signal(self._code.get_data_bits_len())
         self.encoding = Signal(self._code.get_total_bits_len())
 
-    def setup(self):
-        self.message.sample()
+    def setup(self, rng, n: int):
+        self._messages = rng.integers(0, 2, size=(n, self._code.get_data_bits_len()), dtype='uint8')
 
     def eval(self):
-        bits = self._code.encode(self.message.get(list)[::-1])
-        self.encoding.set(bits[::-1])
+        self._encodings = self._code.encode_batch(self._messages)
+
+    def vectors(self):
+        for (message, encoding) in zip(self._messages, self._encodings):
+            self.message.set(bulk.bits(message))
+            self.encoding.set(bulk.bits(encoding))
+            yield
 
 def main():
-    mdl = HammEnc(context.generic('PARITY_BITS', int))
+    mdl = HammEnc(context.generic('PARITY_BITS', int), context.generic('DATA_BITS', int))
+    rng = bulk.rng()
 
     with vectors('inputs.txt', 'i') as inputs, vectors('outputs.txt', 'o') as outputs:
-        for _ in range(1000):
-            mdl.setup()
-            inputs.push(mdl)
+        for n in bulk.batches(bulk.loop_limit()):
+            mdl.setup(rng, n)
             mdl.eval()
-            outputs.push(mdl)
+            for _ in mdl.vectors():
+                inputs.push(mdl)
+                outputs.push(mdl)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
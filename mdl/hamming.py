@@ -16,7 +16,20 @@
 #   The Hamming-code is unreliable with errors > 2 (errors may cancel or be 
 #   unrecoverable).
 #
-#   To execute unit tests for this module, run: `python -m unittest hamming.py`.
+#   Shortened codes hold any number of data bits K with the fewest parity bits
+#   that fit. The block keeps the first K+PARITY_BITS+1 positions of the full
+#   code; the dropped positions are data bits that are always zero.
+#
+#   The batch paths (NumPy) and the parallel stream functions (multiprocessing)
+#   live in the `hamming_batch` and `hamming_parallel` backends, which are only
+#   imported on first use to keep this module quick to import.
+#
+#   Unit tests are in `test_hamming.py`. To execute the unit tests of the model
+#   and its tools (the `test_*.py` modules), run: `python -m unittest`.
+#
+#   To encode or decode a file (or stdin/stdout) as a stream of packed blocks,
+#   run: `python -m hamming encode|decode [input] [-o output]`. Add `-d NUM`
+#   when encoding to use a shortened code with NUM data bits per block.
 #
 # References:
 #   "How to send a self-correcting message (Hamming codes)" - 3Blue1Brown
@@ -25,11 +38,15 @@
 #   "Hamming code" - Wikipedia
 #   https://en.wikipedia.org/wiki/Hamming_code#[7,4]_Hamming_code
 #
-import unittest
 from math import log
 from typing import List
 from typing import Tuple
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import BinaryIO
 import random
+import sys
 
 # --- Constants ----------------------------------------------------------------
 
@@ -68,14 +85,360 @@ def set_parity_bit(arr: List[int], use_even=True) -> bool:
     return (arr.count(1) % 2) ^ (use_even == False)
 
 
+class BitView:
+    '''
+    Reads and writes the bits of a `Block` in LSB-first or MSB-first order
+    without copying them.
+    '''
+    __slots__ = ('_block', '_msb_first')
+
+    def __init__(self, block: 'Block', msb_first: bool):
+        self._block = block
+        self._msb_first = msb_first
+
+
+    def _index(self, i: int) -> int:
+        n = len(self._block)
+        if i < 0:
+            i += n
+        if i < 0 or i >= n:
+            raise IndexError('bit index out of range')
+        return n-1-i if self._msb_first == True else i
+
+
+    def __len__(self) -> int:
+        return len(self._block)
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        return self._block[self._index(i)]
+
+
+    def __setitem__(self, i: int, bit: int):
+        self._block[self._index(i)] = bit
+
+
+    def __iter__(self) -> Iterator[int]:
+        for i in range(0, len(self)):
+            yield self[i]
+
+
+    def tolist(self) -> List[int]:
+        return list(self)
+
+
+    def __str__(self) -> str:
+        return ''.join(str(b) for b in self)
+    pass
+
+
+class Block:
+    '''
+    A compact block of bits packed LSB-first into bytes: bit `i` is bit `i % 8`
+    of byte `i // 8`, matching `encode_bytes` and the `hamm_enc`/`hamm_dec`
+    port layout.
+
+    Indexing, `len`, and iteration follow the bit order of a `List[int]`
+    block, so a `Block` can be used wherever a list of bits is read or has
+    bits flipped (such as `send` and `display`).
+    '''
+    __slots__ = ('_buf', '_len')
+
+    def __init__(self, length: int, buffer=None):
+        '''
+        Creates a block of `length` bits, all zero unless backed by `buffer`.
+
+        A `bytearray` or writable buffer is shared, not copied, so writes to
+        the block show through the buffer and vice versa. A read-only buffer
+        (such as `bytes`) is copied on the first write.
+        '''
+        size = (length+7) // 8
+        if buffer is None:
+            buffer = bytearray(size)
+        elif isinstance(buffer, (bytes, bytearray)) == False:
+            buffer = memoryview(buffer).cast('B')
+        if len(buffer) < size:
+            raise ValueError('buffer holds fewer than '+str(length)+' bits')
+        self._buf = buffer
+        self._len = length
+
+
+    @classmethod
+    def from_bytes(cls, data, length: int=None) -> 'Block':
+        '''
+        Wraps the bytes-like `data` without copying. The block holds every bit
+        of `data` unless `length` is given.
+        '''
+        return cls(8*len(memoryview(data).cast('B')) if length is None else length, data)
+
+
+    @classmethod
+    def from_int(cls, value: int, length: int) -> 'Block':
+        '''
+        Packs the lowest `length` bits of `value` into a new block.
+        '''
+        return cls(length)._assign(value, length)
+
+
+    @classmethod
+    def from_list(cls, bits: List[int], msb_first: bool=False) -> 'Block':
+        '''
+        Packs a list of bits into a new block. The first bit is bit 0 unless
+        `msb_first` is set.
+        '''
+        if msb_first == True:
+            bits = bits[::-1]
+        return cls.from_int(sum(b << i for (i, b) in enumerate(bits)), len(bits))
+
+
+    def _size(self) -> int:
+        return (self._len+7) // 8
+
+
+    def is_readonly(self) -> bool:
+        return isinstance(self._buf, bytes) or (isinstance(self._buf, memoryview) and self._buf.readonly)
+
+
+    def _writable(self):
+        '''
+        Returns the buffer after copying it if it is read-only.
+        '''
+        if self.is_readonly() == True:
+            self._buf = bytearray(self._buf)
+        return self._buf
+
+
+    def _reserve(self, length: int):
+        '''
+        Returns the writable buffer after making sure it holds `length` bits.
+
+        Only a `bytearray` can grow, and only while no view of it is exported
+        (such as one from `memoryview()`), since resizing it would move the
+        bytes under the view.
+        '''
+        size = (length+7) // 8
+        buf = self._writable()
+        if len(buf) < size:
+            if isinstance(buf, bytearray) == False:
+                raise ValueError('buffer holds fewer than '+str(length)+' bits')
+            try:
+                buf.extend(bytes(size-len(buf)))
+            except BufferError:
+                raise ValueError('buffer holds fewer than '+str(length)+' bits and cannot grow while a view of it is exported')
+        return buf
+
+
+    def _assign(self, value: int, length: int) -> 'Block':
+        '''
+        Overwrites the block in place with the lowest `length` bits of `value`,
+        resizing it to `length` bits.
+
+        The bytes are written into the existing buffer, which only grows when
+        it holds fewer than `length` bits.
+        '''
+        size = (length+7) // 8
+        buf = self._reserve(length)
+        buf[0:size] = (value & (2**length-1)).to_bytes(size, 'little')
+        self._len = length
+        return self
+
+
+    def to_int(self) -> int:
+        with memoryview(self._buf) as view:
+            return int.from_bytes(view[0:self._size()], 'little') & (2**self._len-1)
+
+
+    def memoryview(self) -> memoryview:
+        '''
+        Returns a view of the bytes holding the block without copying them.
+        '''
+        return memoryview(self._buf)[0:self._size()]
+
+
+    def __bytes__(self) -> bytes:
+        return self.to_int().to_bytes(self._size(), 'little')
+
+
+    def lsb(self) -> BitView:
+        '''
+        Returns a view of the bits starting at bit 0.
+        '''
+        return BitView(self, False)
+
+
+    def msb(self) -> BitView:
+        '''
+        Returns a view of the bits starting at the highest bit, as written in a
+        testbench vector.
+        '''
+        return BitView(self, True)
+
+
+    def tolist(self, msb_first: bool=False) -> List[int]:
+        return BitView(self, msb_first).tolist()
+
+
+    def __len__(self) -> int:
+        return self._len
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.lsb()[i]
+        if i < 0:
+            i += self._len
+        if i < 0 or i >= self._len:
+            raise IndexError('bit index out of range')
+        return (self._buf[i >> 3] >> (i & 7)) & 1
+
+
+    def __setitem__(self, i: int, bit: int):
+        if i < 0:
+            i += self._len
+        if i < 0 or i >= self._len:
+            raise IndexError('bit index out of range')
+        buf = self._writable()
+        if bit == 1:
+            buf[i >> 3] |= 1 << (i & 7)
+        else:
+            buf[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.lsb())
+
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Block):
+            return self._len == other._len and self.to_int() == other.to_int()
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+
+    def __repr__(self) -> str:
+        return 'Block(\'' + str(self.msb()) + '\')'
+    pass
+
+
+class _CodeTables:
+
+    def __init__(self, parity_bits: int, data_bits: int):
+        '''
+        Precomputes the index tables shared by every `HammingCode` with the
+        same number of `parity_bits` and `data_bits`.
+        '''
+        total = data_bits+parity_bits+1
+        self.parity_bits = parity_bits
+        self.data_bits = data_bits
+        # indices covered by the i-th parity bit (includes the parity bit itself)
+        self.coverage = tuple(
+            tuple(j for j in range(0, total) if (j >> i) & 1 == 1) for i in range(0, parity_bits)
+        )
+        # block indices holding the parity bits (0th bit is the overall parity)
+        self.parity_positions = tuple([0] + [2**i for i in range(0, parity_bits)])
+        # block indices holding the information bits, in message order
+        self.data_positions = tuple(j for j in range(0, total) if j & (j-1) != 0)
+        # bit masks of the coverage for packed integer blocks
+        self.masks = tuple(sum(1 << j for j in c) for c in self.coverage)
+        # contiguous runs of information bits between parity bits as
+        # (block position, message offset, run mask), where the last run may be
+        # cut short by a shortened code
+        self.data_runs = tuple(
+            (2**i+1, 2**i-i-1, 2**min(2**i-1, total-2**i-1)-1) for i in range(1, parity_bits)
+        )
+        # decode actions indexed by (overall parity << PARITY_BITS) | syndrome
+        # as (flip position or -1, corrected, valid), where a syndrome past the
+        # end of a shortened block can only come from an uncorrectable error
+        self.syndromes = tuple(
+            [(-1, False, True)] + [(-1, False, False)] * (2**parity_bits-1) +
+            [(s, True, True) if s < total else (-1, False, False) for s in range(0, 2**parity_bits)]
+        )
+        # bit masks to XOR into packed blocks for each decode action
+        self.flip_masks = tuple(0 if f < 0 else 1 << f for (f, _, _) in self.syndromes)
+        # matrices for the numpy batch paths are built by `hamming_batch` on first use
+        self._matrices = None
+        self._actions = None
+        # full block -> decoded message table for small codes
+        self._lookup = None
+        pass
+
+
+    def get_lookup(self) -> Tuple[Tuple[int, bool, bool], ...]:
+        '''
+        Returns the cached table of `(message, corrected, valid)` for every
+        possible packed block.
+        '''
+        if self._lookup is None:
+            code = HammingCode(self.parity_bits, data_bits=self.data_bits)
+            self._lookup = tuple(code.decode_int(b) for b in range(0, 2**(self.data_bits+self.parity_bits+1)))
+        return self._lookup
+    pass
+
+
+# tables are shared across all instances with the same code size
+_TABLES: Dict[Tuple[int, int], _CodeTables] = dict()
+
+
+def _get_tables(parity_bits: int, data_bits: int) -> _CodeTables:
+    '''
+    Returns the cached tables for `parity_bits` and `data_bits`, building them
+    on first use.
+    '''
+    tables = _TABLES.get((parity_bits, data_bits))
+    if tables is None:
+        tables = _CodeTables(parity_bits, data_bits)
+        _TABLES[(parity_bits, data_bits)] = tables
+    return tables
+
+
+# largest code allowed to build a full block -> message lookup table
+LOOKUP_LIMIT = 4
+
+# most parity bits of a code, since its tables cover all 2**PARITY_BITS
+# positions of the full block
+MAX_PARITY_BITS = 16
+
+
 class HammingCode:
 
-    def __init__(self, parity_bits: int):
+    def __init__(self, parity_bits: int=None, lookup: bool=False, data_bits: int=None):
+        '''
+        Set `data_bits` for a shortened code holding any number of data bits.
+        The number of `parity_bits` defaults to the fewest that fit `data_bits`
+        and must be that number if both are given.
+
+        Set `lookup` to decode packed blocks with a single table lookup. The
+        table has 2**TOTAL_BITS entries, so it is only available for codes with
+        at most `LOOKUP_LIMIT` parity bits.
+
+        Codes have between 2 and `MAX_PARITY_BITS` parity bits.
+        '''
+        if parity_bits is None and data_bits is None:
+            raise ValueError('expected the number of parity bits or data bits')
+        if parity_bits is None:
+            parity_bits = min_parity_bits(data_bits)
+        if parity_bits < 2 or parity_bits > MAX_PARITY_BITS:
+            raise ValueError('parity bits must be between 2 and '+str(MAX_PARITY_BITS))
+        full = 2**parity_bits-parity_bits-1
+        if data_bits is None:
+            data_bits = full
+        elif data_bits < 1 or data_bits > full or parity_bits != min_parity_bits(data_bits):
+            raise ValueError(str(data_bits)+' data bits require '+str(min_parity_bits(max(1, data_bits)))+' parity bits')
         self.parity_bits = parity_bits
+        self.data_bits = data_bits
+        self._tables = _get_tables(parity_bits, data_bits)
+        self._lookup = None
+        if lookup == True:
+            if parity_bits > LOOKUP_LIMIT:
+                raise ValueError('lookup table requires at most '+str(LOOKUP_LIMIT)+' parity bits')
+            self._lookup = self._tables.get_lookup()
 
 
     def get_total_bits_len(self) -> int:
-        return 2**self.get_parity_bits_len()
+        return self.get_data_bits_len()+self.get_parity_bits_len()+1
 
 
     def get_parity_bits_len(self) -> int:
@@ -83,21 +446,18 @@ class HammingCode:
 
 
     def get_data_bits_len(self) -> int:
-        return 2**self.get_parity_bits_len()-self.get_parity_bits_len()-1
+        return self.data_bits
+
+
+    def is_shortened(self) -> bool:
+        return self.data_bits != 2**self.parity_bits-self.parity_bits-1
 
 
     def _get_parity_coverage(self, i: int) -> List[int]:
         '''
         Returns the list of indices covered by the i-th parity bit.
         '''
-        space = _binary_space(self.get_total_bits_len())
-        subset = []
-        # check the i-th bit positions
-        for s in space:
-            if s[self.get_parity_bits_len()-i-1] == '1':
-                subset += [s]
-        # convert from binary to decimal for target indices
-        return [int('0b'+x, base=2) for x in subset]
+        return list(self._tables.coverage[i])
         
 
     def _create_hamming_block(self, chunk: List[int]) -> List[int]:
@@ -107,9 +467,11 @@ class HammingCode:
         Frames the data with the parity bits.
         '''
         # position 0 along with other powers of 2 are reserved for parity data
-        chunk.insert(0, 0)
-        for i in range(0, self.get_parity_bits_len()):
-            chunk.insert(2**i, 0)
+        block = [0] * self.get_total_bits_len()
+        for (i, j) in enumerate(self._tables.data_positions):
+            block[j] = chunk[i]
+        # frame the block in-place to keep the caller's list in sync
+        chunk[:] = block
         return chunk
 
 
@@ -120,41 +482,31 @@ class HammingCode:
         Includes setting the overall parity of the block at 0th bit.
         '''
         # questions to capture redundancy for each parity bit
-        parities = []
-        for i in range(0, self.get_parity_bits_len()):
-            # print('i', i)
-            coverage = self._get_parity_coverage(i)
-            # print(coverage)
+        for (i, coverage) in enumerate(self._tables.coverage):
             data_bits = [block[j] for j in coverage]
-            # print('group', i, data_bits)
             block[2**i] = set_parity_bit(data_bits)
-            parities += [block[2**i]]
             pass
-        # print('parities', parities)
         # set overall parity for SECDED
         block[0] = set_parity_bit(block)
         return block
 
 
-    def _get_parity_coverage(self, i: int) -> List[int]:
-        '''
-        Returns the list of indices covered by the i-th parity bit.
-        '''
-        space = _binary_space(self.get_total_bits_len())
-        subset = []
-        # check the i-th bit positions
-        for s in space:
-            if s[self.get_parity_bits_len()-i-1] == '1':
-                subset += [s]
-        # convert from binary to decimal for target indices
-        return [int('0b'+x, base=2) for x in subset]
-
-
     def encode(self, message: List[int]) -> List[int]:
         '''
         Transforms and formats a plain `message` into an encoded hamming-code
         block.
+
+        The `message` is framed in place and returned, so a `Block` message
+        grows to TOTAL_BITS in its own buffer. Give the buffer room for
+        TOTAL_BITS to insert the parity without resizing it; a `bytearray`
+        with less room is extended, which raises `ValueError` while a view of
+        it is exported.
         '''
+        if isinstance(message, Block):
+            self._check_block(message, self.get_data_bits_len())
+            # check the room first so a failure leaves the message untouched
+            message._reserve(self.get_total_bits_len())
+            return message._assign(self.encode_int(message.to_int()), self.get_total_bits_len())
         block = self._create_hamming_block(message)
         # print(block)
         return self._encode_hamming_ecc(block)
@@ -168,9 +520,7 @@ class HammingCode:
         Deframes the parity bits from the data.
         '''
         # remove parity bits
-        for i in range(self.get_parity_bits_len()-1, -1, -1):
-            chunk.pop(2**i)
-        chunk.pop(0)
+        chunk[:] = [chunk[j] for j in self._tables.data_positions]
         return chunk
 
 
@@ -179,12 +529,143 @@ class HammingCode:
         Transforms and formats an encoded hamming-code `block` into a decoded 
         message.
 
+        The `block` is corrected and deframed in place, so a `Block` shrinks to
+        DATA_BITS in its own buffer.
+
         Returns `(message, corrected, valid)`.
         '''
+        if isinstance(block, Block):
+            self._check_block(block, self.get_total_bits_len())
+            (data, corrected, valid) = self.decode_int(block.to_int())
+            return (block._assign(data, self.get_data_bits_len()), corrected, valid)
         (block, corrected, valid) = self._decode_hamming_ecc(block)
         return (self._destroy_hamming_block(block), corrected, valid)
 
 
+    def _check_block(self, block: Block, length: int):
+        if len(block) != length:
+            raise ValueError('expected a block of '+str(length)+' bits but got '+str(len(block)))
+        pass
+
+
+    def encode_int(self, data: int) -> int:
+        '''
+        Transforms a packed `data` message into a packed hamming-code block.
+
+        Bit `i` of `data` is the i-th message bit and bit `j` of the returned
+        block is the j-th block index, matching the `hamm_enc` port layout.
+        '''
+        block = 0
+        for (pos, offset, run) in self._tables.data_runs:
+            block |= ((data >> offset) & run) << pos
+        # parity bits do not cover each other, so each can be set directly
+        for (i, mask) in enumerate(self._tables.masks):
+            block |= ((block & mask).bit_count() & 1) << (1 << i)
+        # set overall parity for SECDED
+        return block | (block.bit_count() & 1)
+
+
+    def decode_int(self, block: int) -> Tuple[int, bool, bool]:
+        '''
+        Transforms a packed hamming-code `block` into a packed message.
+
+        Uses the same bit layout as `encode_int` and the `hamm_dec` ports.
+
+        Returns `(message, corrected, valid)`.
+        '''
+        if self._lookup is not None:
+            return self._lookup[block]
+        index = (block.bit_count() & 1) << self.parity_bits
+        for (i, mask) in enumerate(self._tables.masks):
+            index |= ((block & mask).bit_count() & 1) << i
+        (_, corrected, valid) = self._tables.syndromes[index]
+        # fix block at the pinpointed error index (if any)
+        block ^= self._tables.flip_masks[index]
+        data = 0
+        for (pos, offset, run) in self._tables.data_runs:
+            data |= ((block >> pos) & run) << offset
+        return (data, corrected, valid)
+
+
+    def encode_batch(self, data):
+        '''
+        Transforms a numpy array of messages with shape (N, DATA_BITS) into
+        an array of hamming-code blocks with shape (N, TOTAL_BITS).
+
+        Column `i` of each row is the i-th list element of `encode`.
+        '''
+        import hamming_batch
+        return hamming_batch.encode_batch(self, data)
+
+
+    def decode_batch(self, blocks):
+        '''
+        Transforms a numpy array of hamming-code blocks with shape
+        (N, TOTAL_BITS) into an array of messages with shape (N, DATA_BITS).
+
+        Returns `(messages, corrected, valid)` where the flags are boolean
+        arrays of length N.
+        '''
+        import hamming_batch
+        return hamming_batch.decode_batch(self, blocks)
+
+
+    def encode_bytes(self, data: bytes) -> bytes:
+        '''
+        Transforms `data` into a stream of packed hamming-code blocks.
+
+        The bytes are read as a little-endian bit stream and split into
+        DATA_BITS messages. Every DATA_BITS bytes fill exactly 8 messages, which
+        encode into exactly TOTAL_BITS bytes, so inputs that are a multiple of
+        DATA_BITS bytes can be encoded independently and concatenated. A trailing
+        partial message is padded with zeros.
+        '''
+        d_bits = self.get_data_bits_len()
+        t_bits = self.get_total_bits_len()
+        mask = 2**d_bits-1
+        out = []
+        for i in range(0, len(data), d_bits):
+            group = data[i:i+d_bits]
+            # number of messages needed to hold this group (8 unless at the tail)
+            count = (8*len(group) + d_bits-1) // d_bits
+            words = int.from_bytes(group, 'little')
+            blocks = 0
+            for k in range(0, count):
+                blocks |= self.encode_int((words >> (k*d_bits)) & mask) << (k*t_bits)
+            out += [blocks.to_bytes((count*t_bits + 7) // 8, 'little')]
+        return b''.join(out)
+
+
+    def decode_bytes(self, data: bytes) -> Tuple[bytes, int, int]:
+        '''
+        Transforms a stream of packed hamming-code blocks from `encode_bytes`
+        back into bytes.
+
+        A trailing partial group decodes into as many whole bytes as its
+        messages fill, which may include padding bits.
+
+        Returns `(data, corrected, invalid)` with the number of blocks that had
+        a single-bit error corrected or a double-bit error detected.
+        '''
+        d_bits = self.get_data_bits_len()
+        t_bits = self.get_total_bits_len()
+        mask = 2**t_bits-1
+        (corrected, invalid) = (0, 0)
+        out = []
+        for i in range(0, len(data), t_bits):
+            group = data[i:i+t_bits]
+            count = (8*len(group)) // t_bits
+            blocks = int.from_bytes(group, 'little')
+            words = 0
+            for k in range(0, count):
+                (word, fixed, valid) = self.decode_int((blocks >> (k*t_bits)) & mask)
+                words |= word << (k*d_bits)
+                corrected += fixed
+                invalid += not valid
+            out += [words.to_bytes((count*d_bits) // 8, 'little')]
+        return (b''.join(out), corrected, invalid)
+
+
     def _decode_hamming_ecc(self, block: List[int]) -> Tuple[List[int], bool, bool]:
         '''
         Decodes the hamming-code. 
@@ -193,41 +674,112 @@ class HammingCode:
         
         Returns the fixed block and the valid signal.
         '''
-        # answer the question for each parity bit
-        answer = ''
-        # block parity
-        par_block = set_parity_bit(block)
+        # block parity selects the upper half of the syndrome table
+        index = set_parity_bit(block) << self.get_parity_bits_len()
         # questions to capture redundancy for each parity bit
-        for i in range(self.get_parity_bits_len()-1, -1, -1):
-            coverage = self._get_parity_coverage(i)
+        for (i, coverage) in enumerate(self._tables.coverage):
             data_bits = [block[j] for j in coverage]
-            parity = set_parity_bit(data_bits)
-            if parity == 0:
-                # rule out the space
-                answer += '0'
-            else:
-                # include this space
-                answer += '1'
+            index |= set_parity_bit(data_bits) << i
             pass
+        # determine the location of the error to correct (if any)
+        (flip, corrected, valid) = self._tables.syndromes[index]
+        if flip >= 0:
+            block[flip] ^= 1
+        return (block, corrected, valid)
+    pass
 
-        # determine if there are unrecoverable errors or zero errors
-        if par_block == 0:
-            # check if two errors were detected
-            if answer.count('1') > 0:
-                # print("info: Detected a double-bit error (unrecoverable)")
-                return (block, False, False)
-            # check if there were zero errors
-            else:
-                # print("info: 0 errors detected")
-                return (block, False, True)
 
-        # otherwise, use the parity bits to pinpoint location of error to correct
-        i = int('0b'+answer, base=2)
-        # print("info: Error index:", i, "("+answer+")")
+class HammingPipeline:
+    '''
+    Cycle-accurate model of the pipelined `hamm_enc_pipe` and `hamm_dec_pipe`
+    entities.
+
+    Each enabled register stage holds one block. A stage loads when it is
+    empty or when its block moves on in the same cycle, so a full pipeline
+    passes one block per cycle and a stalled output fills the stages one at a
+    time before lowering `in_ready`. Disabled stages are wires and add no
+    latency.
+    '''
+
+    def __init__(self, code: HammingCode, decode: bool=False, stages: List[bool]=None):
+        '''
+        Set `decode` to model the decoder instead of the encoder.
+
+        `stages` enables each register in order, matching the `REG_*` generics:
+        `[parity, output]` for the encoder and `[syndrome, correct, extract]`
+        for the decoder. Every register is enabled by default.
+        '''
+        count = 3 if decode == True else 2
+        if stages is None:
+            stages = [True] * count
+        if len(stages) != count:
+            raise ValueError('expected '+str(count)+' register stages but got '+str(len(stages)))
+        self._code = code
+        self._decode = decode
+        self._latency = sum(1 for s in stages if s == True)
+        self.reset()
+
+
+    def reset(self):
+        '''
+        Empties the pipeline and clears the cycle counts.
+        '''
+        # (valid, result) held by each enabled register from input to output
+        self._regs = [(False, None)] * self._latency
+        self.cycles = 0
+        self.accepted = 0
+        self.delivered = 0
+        pass
+
+
+    def get_latency(self) -> int:
+        '''
+        Returns the number of cycles from accepting a block to presenting its
+        result.
+        '''
+        return self._latency
+
+
+    def get_throughput(self) -> float:
+        '''
+        Returns the number of results delivered per cycle since the last reset.
+        '''
+        return self.delivered / self.cycles if self.cycles > 0 else 0.0
+
 
-        # fix block at the pinpointed error index according to parity bits
-        block[i] ^= 1
-        return (block, True, True)
+    def _eval(self, data: int):
+        return self._code.decode_int(data) if self._decode == True else self._code.encode_int(data)
+
+
+    def step(self, in_valid: bool, data: int, out_ready: bool) -> Tuple[bool, bool, object]:
+        '''
+        Advances one clock cycle with the inputs held during that cycle, where
+        `data` is a packed message (or block when decoding).
+
+        Returns `(in_ready, out_valid, result)` as seen before the rising edge.
+        The `result` is the `encode_int` (or `decode_int`) result of the block
+        leaving the pipeline, or `None` while `out_valid` is low.
+        '''
+        entry = (in_valid == True, self._eval(data) if in_valid == True else None)
+        if self._latency == 0:
+            (in_ready, (out_valid, result)) = (out_ready == True, entry)
+        else:
+            # a stage loads when it is empty or its block moves on
+            loads = [False] * self._latency
+            ready = out_ready == True
+            for k in range(self._latency-1, -1, -1):
+                loads[k] = ready or self._regs[k][0] == False
+                ready = loads[k]
+            in_ready = ready
+            (out_valid, result) = self._regs[-1]
+            # shift from the output back so each stage takes the old contents
+            for k in range(self._latency-1, -1, -1):
+                if loads[k] == True:
+                    self._regs[k] = self._regs[k-1] if k > 0 else entry
+        self.cycles += 1
+        self.accepted += in_valid == True and in_ready
+        self.delivered += out_valid and out_ready == True
+        return (in_ready, out_valid, result if out_valid == True else None)
     pass
 
 
@@ -247,6 +799,17 @@ def data_bits(parities: int) -> int:
     return 2**parities-parities-1
 
 
+def min_parity_bits(width: int) -> int:
+    '''
+    Computes the fewest parity bits (excluding the 0th DED bit) of a code that
+    holds `width` data bits.
+    '''
+    parities = 2
+    while 2**parities-parities-1 < width:
+        parities += 1
+    return parities
+
+
 def display(block: List[int], width=None, end='\n'):
     '''
     Formats the Hamming-code block in a square arrangement.
@@ -265,34 +828,44 @@ def display(block: List[int], width=None, end='\n'):
     pass
 
 
-def partition(msg: List[int]) -> List[List[int]]:
+def ipartition(msg: Iterable[int], size: int=DATA_BITS) -> Iterator[List[int]]:
     '''
-    Splits a long string of bits `msg` into a list of chunks with `DATA_BITS`
-    size to be formed into Hamming-code blocks.
+    Lazily splits a stream of bits `msg` into chunks with `size` bits to be
+    formed into Hamming-code blocks.
+
+    The last chunk is padded with zeros.
     '''
-    chunks = []
-    ctr = 0
-    while ctr < len(msg):
-        chunk = [0] * DATA_BITS    
-        for i in range(0, DATA_BITS):
-            chunk[i] = msg[ctr]
-            ctr += 1
-            # exit early if not enough bits in the message to fill the current chunk
-            if ctr == len(msg):
-                break
-        chunks += [chunk]
-        pass
-    return chunks
+    chunk = []
+    for bit in msg:
+        chunk += [bit]
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk + [0] * (size-len(chunk))
+    pass
 
 
-def send(block: List[int], noise=None, spots=[]) -> List[int]:
+def partition(msg: List[int], size: int=DATA_BITS) -> List[List[int]]:
+    '''
+    Splits a long string of bits `msg` into a list of chunks with `size` bits
+    (`DATA_BITS` by default) to be formed into Hamming-code blocks.
+    '''
+    return list(ipartition(msg, size))
+
+
+def send(block: List[int], noise=None, spots=None) -> List[int]:
     '''
     Transmits a pure hamming-code block over a noisy channel 
     that may flip 0, 1, or 2 bits.
 
     Use `spots` to explicitly declare which positions to flip.
     Use `noise` to explicitly set the number of flips in the transmission.
+
+    For batches of blocks, see the `channel` module.
     '''
+    if spots is None:
+        spots = []
     # use custom-defined indices to flip
     if len(spots) > 0:
         for s in spots:
@@ -302,11 +875,8 @@ def send(block: List[int], noise=None, spots=[]) -> List[int]:
     # use custom-defined amount of noise (0, 1, or 2)
     if noise == None:
         noise = random.randint(0, 2)
-    for _ in range(0, noise):
-        # select a random index not already flipped
-        flip = random.randint(0, len(block)-1)
-        while spots.count(flip) > 0:
-            flip = random.randint(0, len(block)-1)
+    # select random indices that are not already flipped
+    for flip in random.sample(range(0, len(block)), noise):
         # reverse the bit
         block[flip] ^= 1
         # remember that position is now flipped
@@ -315,32 +885,233 @@ def send(block: List[int], noise=None, spots=[]) -> List[int]:
     return block
 
 
-# --- Logic --------------------------------------------------------------------
+# --- Streams ------------------------------------------------------------------
 
-# even parity = even number of 1's -> set bit to 0
-# odd parity  = odd  number of 1's -> set bit to 1 to achieve to even parity
+# identifies a stream written by `encode_stream`; followed by 1 byte for the
+# number of parity bits
+MAGIC = b'HAMM'
 
-if __name__ == '__main__':
-    if PARITY_BITS < 2:
-        exit("error: PARITY_BITS must be greater than 1")
+HEADER_SIZE = len(MAGIC) + 1
+
+# identifies a stream of shortened codes; the header is followed by 4 more
+# bytes for the number of data bits
+SHORT_MAGIC = b'HAMS'
+
+SHORT_HEADER_SIZE = HEADER_SIZE + 4
+
+# the byte length of the original data is stored as this many bytes
+LENGTH_SIZE = 8
+
+# default number of bytes read from a stream at once
+BUFFER_SIZE = 2**16
 
-    # 33 bits
-    message = [
-        0, 0, 1, 1, 0, 0, 0, 1,
-        1, 1, 0,
-        0, 1, 1, 0, 0, 1, 1, 0, 
-        1, 0, 0, 0, 0, 1, 0, 0, 
-        0, 0, 1, 1, 1, 0, 1, 1, 
-        0, 1, 0, 1, 1, 1, 0, 0,
-        1,
-    ] 
 
+def _read_chunks(src: BinaryIO, size: int, buffer_size: int=BUFFER_SIZE) -> Iterator[bytes]:
+    '''
+    Lazily reads `src` into chunks that are a multiple of `size` bytes.
+
+    Only the last chunk may be shorter.
+    '''
+    buffer_size = max(size, buffer_size - buffer_size % size)
+    pending = b''
+    while True:
+        buf = src.read(buffer_size)
+        if not buf:
+            break
+        pending += buf
+        cut = len(pending) - len(pending) % size
+        if cut >= buffer_size:
+            yield pending[:cut]
+            pending = pending[cut:]
+    if len(pending) > 0:
+        yield pending
+    pass
+
+
+def _trailer_size(code: HammingCode) -> int:
+    '''
+    Computes the number of bytes of the encoded length trailer.
+    '''
+    d_bits = code.get_data_bits_len()
+    # the length is padded to whole groups so the trailer is always byte-aligned
+    return ((LENGTH_SIZE + d_bits-1) // d_bits) * code.get_total_bits_len()
+
+
+def _encoded_size(code: HammingCode, length: int) -> int:
+    '''
+    Computes the number of bytes `encode_bytes` produces for `length` bytes.
+    '''
+    d_bits = code.get_data_bits_len()
+    t_bits = code.get_total_bits_len()
+    tail = (8*(length % d_bits) + d_bits-1) // d_bits
+    return (length // d_bits)*t_bits + (tail*t_bits + 7) // 8
+
+
+def _trailer(code: HammingCode, length: int) -> bytes:
+    '''
+    Encodes the byte `length` of the original data for the end of a stream.
+    '''
+    # pad the length to fill whole groups of messages
+    trailer = length.to_bytes(LENGTH_SIZE, 'little')
+    trailer += bytes((-len(trailer)) % code.get_data_bits_len())
+    return code.encode_bytes(trailer)
+
+
+def _header(code: HammingCode) -> bytes:
+    '''
+    Writes the header identifying the `code` used by a stream.
+    '''
+    if code.is_shortened() == False:
+        return MAGIC + bytes([code.get_parity_bits_len()])
+    return SHORT_MAGIC + bytes([code.get_parity_bits_len()]) + code.get_data_bits_len().to_bytes(4, 'little')
+
+
+def _header_size(header: bytes) -> int:
+    '''
+    Returns the size of the header that starts with the first `HEADER_SIZE`
+    bytes of `header`.
+    '''
+    return SHORT_HEADER_SIZE if header[:len(SHORT_MAGIC)] == SHORT_MAGIC else HEADER_SIZE
+
+
+def _parse_header(header: bytes) -> Tuple[HammingCode, int]:
+    '''
+    Reads the code used by a stream from its `header`.
+
+    Returns `(code, size)` with the size of the header in bytes.
+    '''
+    size = _header_size(header)
+    if len(header) < size or header[:len(MAGIC)] not in (MAGIC, SHORT_MAGIC):
+        raise ValueError('missing hamming stream header')
+    data_bits = int.from_bytes(header[HEADER_SIZE:size], 'little') if size == SHORT_HEADER_SIZE else None
+    try:
+        code = HammingCode(header[len(MAGIC)], data_bits=data_bits)
+    except ValueError:
+        raise ValueError('invalid hamming stream header')
+    return (code, size)
+
+
+def _read_header(src: BinaryIO) -> Tuple[HammingCode, int]:
+    '''
+    Reads the header from the start of `src`.
+    '''
+    header = src.read(HEADER_SIZE)
+    header += src.read(_header_size(header) - HEADER_SIZE)
+    return _parse_header(header)
+
+
+def _new_code(parity_bits: int=None, data_bits: int=None) -> HammingCode:
+    '''
+    Creates the code for writing a stream, which uses `PARITY_BITS` when
+    neither size is given.
+    '''
+    if parity_bits is None and data_bits is None:
+        parity_bits = PARITY_BITS
+    return HammingCode(parity_bits, data_bits=data_bits)
+
+
+def encode_stream(src: BinaryIO, dst: BinaryIO, parity_bits: int=None, buffer_size: int=BUFFER_SIZE, data_bits: int=None) -> int:
+    '''
+    Encodes all bytes from `src` into packed hamming-code blocks on `dst`.
+
+    The output is a header, the encoded data, and the encoded byte length of
+    the data so the padding can be removed when decoding. Memory use is bounded
+    by `buffer_size` regardless of the input size.
+
+    Set `data_bits` to use a shortened code. The code defaults to `PARITY_BITS`.
+
+    Returns the number of bytes read from `src`.
+    '''
+    code = _new_code(parity_bits, data_bits)
+    d_bits = code.get_data_bits_len()
+    dst.write(_header(code))
+    length = 0
+    for chunk in _read_chunks(src, d_bits, buffer_size):
+        dst.write(code.encode_bytes(chunk))
+        length += len(chunk)
+    dst.write(_trailer(code, length))
+    return length
+
+
+def decode_stream(src: BinaryIO, dst: BinaryIO, buffer_size: int=BUFFER_SIZE) -> Tuple[int, int, int]:
+    '''
+    Decodes a stream written by `encode_stream` from `src` into `dst`.
+
+    Memory use is bounded by `buffer_size` regardless of the input size.
+
+    Returns `(blocks, corrected, invalid)` with the total number of blocks and
+    the number of blocks that had a single-bit error corrected or a double-bit
+    error detected.
+    '''
+    (code, _) = _read_header(src)
+    t_bits = code.get_total_bits_len()
+    trailer_size = _trailer_size(code)
+    # hold back the trailer and the last (possibly padded) group of blocks
+    hold = trailer_size + t_bits
+    (blocks, corrected, invalid) = (0, 0, 0)
+    written = 0
+    pending = b''
+    for chunk in _read_chunks(src, t_bits, buffer_size):
+        pending += chunk
+        cut = max(0, len(pending) - hold)
+        cut -= cut % t_bits
+        if cut > 0:
+            (data, fixed, bad) = code.decode_bytes(pending[:cut])
+            dst.write(data)
+            written += len(data)
+            (blocks, corrected, invalid) = (blocks + cut*8 // t_bits, corrected + fixed, invalid + bad)
+            pending = pending[cut:]
+    if len(pending) < trailer_size:
+        raise ValueError('hamming stream is truncated')
+    # the trailer always decodes into whole bytes at the end
+    (trailer, fixed, bad) = code.decode_bytes(pending[-trailer_size:])
+    (blocks, corrected, invalid) = (blocks + trailer_size*8 // t_bits, corrected + fixed, invalid + bad)
+    length = int.from_bytes(trailer[:LENGTH_SIZE], 'little')
+    (data, fixed, bad) = code.decode_bytes(pending[:-trailer_size])
+    (blocks, corrected, invalid) = (blocks + (len(pending)-trailer_size)*8 // t_bits, corrected + fixed, invalid + bad)
+    if length < written or length > written + len(data):
+        raise ValueError('hamming stream length does not match its data')
+    dst.write(data[:length-written])
+    return (blocks, corrected, invalid)
+
+
+# --- Backends -----------------------------------------------------------------
+
+# names defined by the optional backends, which are imported on first use
+_BACKENDS = {
+    'verify_secded': 'hamming_batch',
+    'ScrubReport': 'hamming_batch',
+    'scrub': 'hamming_batch',
+    'WINDOW_SIZE': 'hamming_batch',
+    'SHARD_SIZE': 'hamming_parallel',
+    'parallel_encode': 'hamming_parallel',
+    'parallel_decode': 'hamming_parallel',
+    'parallel_encode_file': 'hamming_parallel',
+    'parallel_decode_file': 'hamming_parallel',
+}
+
+
+def __getattr__(name: str):
+    '''
+    Resolves `name` from its backend, importing the backend on first use.
+    '''
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        raise AttributeError('module '+repr(__name__)+' has no attribute '+repr(name))
+    import importlib
+    return getattr(importlib.import_module(backend), name)
+
+
+def demo():
+    '''
+    Walks through encoding, transmitting, and decoding a random message.
+    '''
     # generate random message bits
     message = [random.randint(0, 1) for _ in range(0, DATA_BITS)]
 
     ham = HammingCode(PARITY_BITS)
 
-    # divide message into 11-bit chunks
+    # divide message into DATA_BITS-bit chunks
     chunk = partition(message)
     tx_message = chunk[0]
     print("Sender's Data:", tx_message)
@@ -361,7 +1132,7 @@ if __name__ == '__main__':
     display(packet)
 
     # decode using hamming-code
-    (decode, valid) = ham.decode_hamming_ecc(packet)
+    (decode, _, valid) = ham._decode_hamming_ecc(packet)
 
     # continue to deframe if the message was recoverable
     if valid == 1:
@@ -380,69 +1151,103 @@ if __name__ == '__main__':
     pass
 
 
-# --- Tests --------------------------------------------------------------------
-
-# unit tests for various hamming functions
-class TestHammingEcc(unittest.TestCase):
-    # @todo
-    def test_smoke(self):
-        self.assertEqual(True, True)
-        pass
-
-
-    def test_bin_space(self):
-        space = _binary_space(2**1)
-        self.assertEqual(space, ['0', '1'])
-
-        space = _binary_space(2**2)
-        self.assertEqual(space, ['00', '01', '10', '11'])
-
-        space = _binary_space(2**3)
-        self.assertEqual(space, [
-            '000', '001', '010', '011',
-            '100', '101', '110', '111'
-        ])
-        pass
-
-
-    def test_send(self):
-        # flip 1 location
-        message = [0, 1, 1]
-        send(message, spots=[0])
-        self.assertEqual(message, [1, 1, 1])
-        # flip 2 locations
-        message = [0, 1, 1]
-        send(message, spots=[0, 2])
-        self.assertEqual(message, [1, 1, 0])
-        # flip 1 bit
-        message = [0, 1, 1, 0]
-        send(message, noise=1)
-        self.assertNotEqual(message, [0, 1, 1, 0])
-        # flip 0 bits
-        message = [0, 1, 1, 0]
-        send(message, noise=0, spots=[])
-        self.assertEqual(message, [0, 1, 1, 0])
-        pass
-
-
-    def test_get_parity_coverage(self):
-        pass
-
+def _open(path: str, mode: str):
+    '''
+    Opens the file at `path` in binary `mode`, where '-' selects stdin/stdout.
 
-    def test_compute_parity(self):
-        # even parity
-        check = set_parity_bit([1, 0, 0])
-        self.assertEqual(check, 1)
+    Stdin and stdout are left open when the returned context exits, so the
+    command can still report to them.
+    '''
+    if path == '-':
+        from contextlib import nullcontext
+        return nullcontext(sys.stdin.buffer if mode == 'rb' else sys.stdout.buffer)
+    return open(path, mode)
+
+
+def main(argv: List[str]=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='hamming', description='Extended hamming-code (SECDED) model')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    enc = sub.add_parser('encode', help='encode bytes into hamming-code blocks')
+    enc.add_argument('input', nargs='?', default='-', help='file to read (default: stdin)')
+    enc.add_argument('--output', '-o', default='-', help='file to write (default: stdout)')
+    enc.add_argument('--parity-bits', '-p', type=int, default=None, metavar='NUM', help='number of parity bits (default: '+str(PARITY_BITS)+' or the fewest for --data-bits)')
+    enc.add_argument('--data-bits', '-d', type=int, default=None, metavar='NUM', help='number of data bits for a shortened code')
+    enc.add_argument('--buffer-size', type=int, default=BUFFER_SIZE, metavar='BYTES', help='number of bytes to read at once')
+    enc.add_argument('--jobs', '-j', type=int, default=1, metavar='NUM', help='number of worker processes for file to file encoding')
+
+    dec = sub.add_parser('decode', help='decode hamming-code blocks into bytes')
+    dec.add_argument('input', nargs='?', default='-', help='file to read (default: stdin)')
+    dec.add_argument('--output', '-o', default='-', help='file to write (default: stdout)')
+    dec.add_argument('--buffer-size', type=int, default=BUFFER_SIZE, metavar='BYTES', help='number of bytes to read at once')
+    dec.add_argument('--jobs', '-j', type=int, default=1, metavar='NUM', help='number of worker processes for file to file decoding')
+
+    scr = sub.add_parser('scrub', help='correct a file of packed hamming-code blocks in place')
+    scr.add_argument('input', help='file to scrub')
+    scr.add_argument('--parity-bits', '-p', type=int, default=None, metavar='NUM', help='number of parity bits (default: '+str(PARITY_BITS)+' or the fewest for --data-bits)')
+    scr.add_argument('--data-bits', '-d', type=int, default=None, metavar='NUM', help='number of data bits for a shortened code')
+    scr.add_argument('--offset', type=int, default=0, metavar='BYTES', help='number of bytes to skip at the start of the file')
+    scr.add_argument('--dry-run', action='store_true', help='report errors without writing corrections')
+
+    ver = sub.add_parser('verify', help='check every single-bit and double-bit error pattern')
+    ver.add_argument('--parity-bits', '-p', type=int, default=None, metavar='NUM', help='number of parity bits (default: '+str(PARITY_BITS)+' or the fewest for --data-bits)')
+    ver.add_argument('--data-bits', '-d', type=int, default=None, metavar='NUM', help='number of data bits for a shortened code')
+
+    sub.add_parser('demo', help='encode, transmit, and decode a random message')
+
+    args = parser.parse_args(argv)
+
+    # shards are only used between regular files
+    sharded = getattr(args, 'jobs', 1) > 1 and args.input != '-' and args.output != '-'
+
+    if args.command == 'demo':
+        demo()
+    elif args.command in ('encode', 'verify', 'scrub'):
+        if args.parity_bits is not None and (args.parity_bits < 2 or args.parity_bits > MAX_PARITY_BITS):
+            exit("error: parity bits must be between 2 and "+str(MAX_PARITY_BITS))
+        try:
+            code = _new_code(args.parity_bits, args.data_bits)
+        except ValueError as e:
+            exit('error: '+str(e))
+        (p_bits, d_bits) = (code.get_parity_bits_len(), code.get_data_bits_len())
+    if args.command == 'encode':
+        if sharded == True:
+            from hamming_parallel import parallel_encode_file
+            parallel_encode_file(args.input, args.output, p_bits, args.jobs, data_bits=d_bits)
+        else:
+            with _open(args.input, 'rb') as src, _open(args.output, 'wb') as dst:
+                encode_stream(src, dst, p_bits, args.buffer_size, data_bits=d_bits)
+    elif args.command == 'verify':
+        from hamming_batch import verify_secded
+        try:
+            count = verify_secded(p_bits, data_bits=d_bits)
+        except AssertionError as e:
+            exit('error: '+str(e))
+        print('info: verified SECDED for', count, 'error patterns')
+    elif args.command == 'scrub':
+        from hamming_batch import scrub
+        print(scrub(args.input, p_bits, args.offset, args.dry_run, data_bits=d_bits))
+    elif args.command == 'decode':
+        try:
+            if sharded == True:
+                from hamming_parallel import parallel_decode_file
+                (blocks, corrected, invalid) = parallel_decode_file(args.input, args.output, args.jobs)
+            else:
+                with _open(args.input, 'rb') as src, _open(args.output, 'wb') as dst:
+                    (blocks, corrected, invalid) = decode_stream(src, dst, args.buffer_size)
+        except ValueError as e:
+            exit('error: '+str(e))
+        print('info: decoded', blocks, 'blocks ('+str(corrected), 'corrected,', invalid, 'uncorrectable)', file=sys.stderr)
+    pass
 
-        check = set_parity_bit([1, 0, 0, 1])
-        self.assertEqual(check, 0)
 
-        # odd parity
-        check = set_parity_bit([1, 0, 0, 1], use_even=False)
-        self.assertEqual(check, 1)
+# --- Logic --------------------------------------------------------------------
 
-        check = set_parity_bit([1, 0, 1, 1], use_even=False)
-        self.assertEqual(check, 0)
-        pass
+# even parity = even number of 1's -> set bit to 0
+# odd parity  = odd  number of 1's -> set bit to 1 to achieve to even parity
 
-    pass
+if __name__ == '__main__':
+    if PARITY_BITS < 2:
+        exit("error: PARITY_BITS must be greater than 1")
+    main()
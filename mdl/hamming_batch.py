@@ -0,0 +1,236 @@
+# File: hamming_batch.py
+# Details:
+#   NumPy backend of the hamming model for arrays of blocks.
+#
+#   Holds the batch paths of `HammingCode` along with the checks and tools
+#   built on them (`verify_secded` and `scrub`). The `hamming` module imports
+#   this backend on first use, so models that only use the list, packed-int,
+#   and bytes paths never load NumPy.
+#
+import mmap
+import os
+import time
+from math import gcd
+from typing import List
+import numpy as np
+
+from hamming import HammingCode, _CodeTables, _new_code
+
+# --- Batches ------------------------------------------------------------------
+
+def get_matrices(tables: _CodeTables):
+    '''
+    Returns the cached `(generator, check)` GF(2) matrices of `tables` as
+    float32 numpy arrays to allow fast BLAS products (sums stay exact below
+    2**24).
+
+    The generator has shape (DATA_BITS, TOTAL_BITS) and maps a message row
+    to its block row. The check matrix has shape (TOTAL_BITS, PARITY_BITS)
+    and maps a block row to its syndrome bits.
+    '''
+    if tables._matrices is None:
+        total = tables.data_bits+tables.parity_bits+1
+        code = HammingCode(tables.parity_bits, data_bits=tables.data_bits)
+        # the code is linear, so each row is the block of a one-hot message
+        generator = np.zeros((len(tables.data_positions), total), dtype=np.float32)
+        for k in range(0, len(tables.data_positions)):
+            block = code.encode_int(1 << k)
+            generator[k] = [(block >> j) & 1 for j in range(0, total)]
+        check = np.zeros((total, tables.parity_bits), dtype=np.float32)
+        for (i, coverage) in enumerate(tables.coverage):
+            check[list(coverage), i] = 1
+        tables._matrices = (generator, check)
+    return tables._matrices
+
+
+def get_actions(tables: _CodeTables):
+    '''
+    Returns the syndrome table as cached numpy arrays of
+    `(flip positions, corrected, valid)` for the batch decoder.
+    '''
+    if tables._actions is None:
+        (flips, corrected, valid) = zip(*tables.syndromes)
+        tables._actions = (
+            np.array(flips, dtype=np.intp),
+            np.array(corrected, dtype=bool),
+            np.array(valid, dtype=bool),
+        )
+    return tables._actions
+
+
+def encode_batch(code: HammingCode, data):
+    '''
+    Transforms a numpy array of messages with shape (N, DATA_BITS) into
+    an array of hamming-code blocks with shape (N, TOTAL_BITS).
+
+    Column `i` of each row is the i-th list element of `HammingCode.encode`.
+    '''
+    data = np.asarray(data)
+    if data.ndim != 2 or data.shape[1] != code.get_data_bits_len():
+        raise ValueError('expected messages with shape (N, '+str(code.get_data_bits_len())+')')
+    (generator, _) = get_matrices(code._tables)
+    products = data.astype(np.float32) @ generator
+    return (products.astype(np.int32) & 1).astype(np.uint8)
+
+
+def check_batch(code: HammingCode, blocks):
+    '''
+    Computes the decode actions for a numpy array of hamming-code `blocks`
+    with shape (N, TOTAL_BITS) without modifying them.
+
+    Returns `(flip, corrected, valid)` arrays of length N, where `flip` is
+    the index of the bit to correct or -1.
+    '''
+    (_, check) = get_matrices(code._tables)
+    (flips, corrections, checks) = get_actions(code._tables)
+    syndrome_bits = (blocks.astype(np.float32) @ check).astype(np.int32) & 1
+    index = syndrome_bits @ (1 << np.arange(code.get_parity_bits_len(), dtype=np.int32))
+    index |= (blocks.sum(axis=1, dtype=np.int32) & 1) << code.get_parity_bits_len()
+    return (flips[index], corrections[index], checks[index])
+
+
+def decode_batch(code: HammingCode, blocks):
+    '''
+    Transforms a numpy array of hamming-code blocks with shape
+    (N, TOTAL_BITS) into an array of messages with shape (N, DATA_BITS).
+
+    Returns `(messages, corrected, valid)` where the flags are boolean
+    arrays of length N.
+    '''
+    blocks = np.array(blocks, dtype=np.uint8)
+    if blocks.ndim != 2 or blocks.shape[1] != code.get_total_bits_len():
+        raise ValueError('expected blocks with shape (N, '+str(code.get_total_bits_len())+')')
+    (flip, corrected, valid) = check_batch(code, blocks)
+    # fix each block at its pinpointed error index
+    rows = np.nonzero(flip >= 0)[0]
+    blocks[rows, flip[rows]] ^= 1
+    messages = blocks[:, list(code._tables.data_positions)]
+    return (messages, corrected, valid)
+
+
+def verify_secded(parity_bits: int=None, messages=None, data_bits: int=None) -> int:
+    '''
+    Exhaustively checks the SECDED guarantees for every single-bit and every
+    double-bit error pattern applied to the blocks of `messages`.
+
+    `messages` is an array of shape (N, DATA_BITS); by default it holds the
+    all-zeros, all-ones, and alternating messages along with a few seeded
+    random messages. Set `data_bits` to check a shortened code. The code
+    defaults to `PARITY_BITS`.
+
+    Every single-bit error must be corrected back to the original message and
+    every double-bit error must be detected as invalid. Raises an
+    `AssertionError` describing the first pattern that fails.
+
+    Returns the number of error patterns checked.
+    '''
+    code = _new_code(parity_bits, data_bits)
+    (d_bits, t_bits) = (code.get_data_bits_len(), code.get_total_bits_len())
+    if messages is None:
+        messages = np.concatenate([
+            np.zeros((1, d_bits), dtype=np.uint8),
+            np.ones((1, d_bits), dtype=np.uint8),
+            (np.arange(0, d_bits, dtype=np.uint8) & 1)[None, :],
+            np.random.default_rng(0).integers(0, 2, size=(2, d_bits), dtype=np.uint8),
+        ])
+    messages = np.asarray(messages, dtype=np.uint8)
+    singles = np.eye(t_bits, dtype=np.uint8)
+    (first, second) = np.triu_indices(t_bits, 1)
+    doubles = singles[first] ^ singles[second]
+    for (message, block) in zip(messages, code.encode_batch(messages)):
+        (decoded, corrected, valid) = code.decode_batch(block ^ singles)
+        failed = np.nonzero(~corrected | ~valid | np.any(decoded != message, axis=1))[0]
+        if len(failed) > 0:
+            raise AssertionError('single-bit error at index '+str(failed[0])+' was not corrected')
+        (_, _, valid) = code.decode_batch(block ^ doubles)
+        failed = np.nonzero(valid)[0]
+        if len(failed) > 0:
+            k = failed[0]
+            raise AssertionError('double-bit error at indices '+str((first[k], second[k]))+' was not detected')
+    return len(messages) * (len(singles) + len(doubles))
+
+
+# --- Scrubbing ----------------------------------------------------------------
+
+# default number of bytes checked at once while scrubbing
+WINDOW_SIZE = 2**20
+
+
+class ScrubReport:
+
+    def __init__(self, blocks: int, corrected: int, invalid: List[int], size: int, elapsed: float):
+        # number of blocks checked
+        self.blocks = blocks
+        # number of blocks with a single-bit error written back as corrected
+        self.corrected = corrected
+        # byte offsets of blocks with a detected double-bit error
+        self.invalid = invalid
+        # number of bytes checked
+        self.size = size
+        # wall-clock time in seconds
+        self.elapsed = elapsed
+        pass
+
+
+    def get_bandwidth(self) -> float:
+        '''
+        Returns the scrub bandwidth in MB/s.
+        '''
+        return (self.size / 1e6) / self.elapsed if self.elapsed > 0 else float('inf')
+
+
+    def __str__(self) -> str:
+        lines = [
+            'info: scrubbed '+str(self.blocks)+' blocks ('+str(self.corrected)+' corrected, '+str(len(self.invalid))+' uncorrectable)',
+            'info: bandwidth: '+format(self.get_bandwidth(), '.2f')+' MB/s',
+        ]
+        lines += ['  -> uncorrectable block at offset '+format(x, '#x') for x in self.invalid]
+        return '\n'.join(lines)
+    pass
+
+
+def scrub(path: str, parity_bits: int=None, offset: int=0, dry_run: bool=False, window_size: int=WINDOW_SIZE, data_bits: int=None) -> ScrubReport:
+    '''
+    Scrubs a file of packed hamming-code blocks (as written by `encode_bytes`)
+    in place, starting `offset` bytes into the file.
+
+    The file is memory-mapped and checked one window at a time, so files
+    larger than memory are supported. Only bytes holding a single-bit error
+    are written back; clean blocks are never copied or written. Set `dry_run`
+    to only report the errors.
+
+    For blocks narrower than a byte, the offset of an uncorrectable block is
+    the offset of the byte that holds it. Set `data_bits` for blocks of a
+    shortened code. The code defaults to `PARITY_BITS`.
+    '''
+    code = _new_code(parity_bits, data_bits)
+    t_bits = code.get_total_bits_len()
+    # windows hold whole blocks and whole bytes
+    step = t_bits // gcd(t_bits, 8)
+    window_size = max(step, window_size - window_size % step)
+    (blocks, corrected, invalid) = (0, 0, [])
+    start = time.perf_counter()
+    size = max(0, os.path.getsize(path) - offset)
+    size -= size % step
+    if size > 0:
+        with open(path, 'rb' if dry_run == True else 'r+b') as f:
+            access = mmap.ACCESS_READ if dry_run == True else mmap.ACCESS_WRITE
+            with mmap.mmap(f.fileno(), 0, access=access) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for i in range(offset, offset+size, window_size):
+                    count = min(window_size, offset+size-i)
+                    view = np.frombuffer(mm, dtype=np.uint8, count=count, offset=i)
+                    bits = np.unpackbits(view, bitorder='little').reshape(-1, t_bits)
+                    del view
+                    (flip, fixed, valid) = check_batch(code, bits)
+                    for row in np.nonzero(fixed)[0]:
+                        bit = int(row)*t_bits + int(flip[row])
+                        if dry_run == False:
+                            mm[i + bit // 8] ^= 1 << (bit % 8)
+                    invalid += [i + (int(row)*t_bits) // 8 for row in np.nonzero(~valid)[0]]
+                    blocks += len(bits)
+                    corrected += int(np.count_nonzero(fixed))
+                if dry_run == False:
+                    mm.flush()
+    return ScrubReport(blocks, corrected, invalid, size, time.perf_counter()-start)
@@ -0,0 +1,221 @@
+# File: hamming_parallel.py
+# Details:
+#   Multiprocessing backend of the hamming model for large streams and files.
+#
+#   Splits data into block-aligned shards that worker processes encode or
+#   decode into the same stream format as `hamming.encode_stream`. The
+#   `hamming` module imports this backend on first use of a `parallel_*`
+#   function.
+#
+import mmap
+import os
+from collections import deque
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterator
+from typing import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+from hamming import HammingCode
+from hamming import LENGTH_SIZE, SHORT_HEADER_SIZE
+from hamming import _new_code, _header, _parse_header, _read_header, _encoded_size, _trailer, _trailer_size
+
+# --- Parallel -----------------------------------------------------------------
+
+# default number of input bytes given to a worker at once
+SHARD_SIZE = 2**20
+
+
+def _shards(start: int, stop: int, size: int) -> List[Tuple[int, int]]:
+    '''
+    Divides the byte range `start` to `stop` into `(start, stop)` shards of
+    `size` bytes.
+    '''
+    return [(i, min(i+size, stop)) for i in range(start, stop, size)]
+
+
+def _encode_shard(size: Tuple[int, int], data: bytes) -> bytes:
+    # tables are cached per worker process after the first shard
+    return _code(size).encode_bytes(data)
+
+
+def _decode_shard(size: Tuple[int, int], data: bytes) -> Tuple[bytes, int, int]:
+    return _code(size).decode_bytes(data)
+
+
+def _size(code: HammingCode) -> Tuple[int, int]:
+    '''
+    Returns the `(parity_bits, data_bits)` to rebuild `code` in a worker
+    process.
+    '''
+    return (code.get_parity_bits_len(), code.get_data_bits_len())
+
+
+def _code(size: Tuple[int, int]) -> HammingCode:
+    '''
+    Rebuilds the code from its `size` in a worker process.
+    '''
+    (parity_bits, data_bits) = size
+    return HammingCode(parity_bits, data_bits=data_bits)
+
+
+def _encode_file_shard(size: Tuple[int, int], src: str, dst: str, start: int, stop: int, offset: int):
+    with open(src, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = _code(size).encode_bytes(mm[start:stop])
+    with open(dst, 'r+b') as f:
+        f.seek(offset)
+        f.write(data)
+    pass
+
+
+def _decode_file_shard(size: Tuple[int, int], src: str, dst: str, start: int, stop: int, offset: int, limit: int) -> Tuple[int, int]:
+    with open(src, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (data, corrected, invalid) = _code(size).decode_bytes(mm[start:stop])
+    with open(dst, 'r+b') as f:
+        f.seek(offset)
+        f.write(data[:max(0, limit-offset)])
+    return (corrected, invalid)
+
+
+def _map_shards(pool: ProcessPoolExecutor, fn: Callable, work: Iterable[tuple], window: int) -> Iterator:
+    '''
+    Yields the result of `fn` for each tuple of arguments in `work` in order.
+    Arguments are taken from `work` and submitted as earlier results are
+    taken, so at most `window` shards are in flight (and copied) at once.
+
+    The shards still pending are cancelled when a shard fails.
+    '''
+    pending = deque()
+    try:
+        for args in work:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(pool.submit(fn, *args))
+        while len(pending) > 0:
+            yield pending.popleft().result()
+    finally:
+        for f in pending:
+            f.cancel()
+    pass
+
+
+def _window(jobs: int) -> int:
+    '''
+    Returns the number of shards kept in flight for `jobs` worker processes.
+    '''
+    return 2 * (jobs if jobs != None else (os.cpu_count() or 1))
+
+
+def _shard_multiple(size: int, step: int) -> int:
+    '''
+    Rounds the shard `size` down to a whole number of `step` bytes.
+    '''
+    return max(step, size - size % step)
+
+
+def parallel_encode(data: bytes, parity_bits: int=None, jobs: int=None, shard_size: int=SHARD_SIZE, data_bits: int=None) -> bytes:
+    '''
+    Encodes `data` into the same stream as `encode_stream` by splitting it into
+    block-aligned shards encoded across `jobs` worker processes.
+    '''
+    code = _new_code(parity_bits, data_bits)
+    header = _header(code)
+    shard_size = _shard_multiple(shard_size, code.get_data_bits_len())
+    out = bytearray(len(header) + _encoded_size(code, len(data)))
+    out[:len(header)] = header
+    shards = _shards(0, len(data), shard_size)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = _map_shards(pool, _encode_shard, ((_size(code), data[a:b]) for (a, b) in shards), _window(jobs))
+        # write each shard back in order to its place in the output
+        for ((a, _), result) in zip(shards, results):
+            offset = len(header) + _encoded_size(code, a)
+            out[offset:offset+len(result)] = result
+    return bytes(out) + _trailer(code, len(data))
+
+
+def parallel_decode(data: bytes, jobs: int=None, shard_size: int=SHARD_SIZE) -> Tuple[bytes, int, int, int]:
+    '''
+    Decodes a stream written by `encode_stream` or `parallel_encode` by
+    splitting it into block-aligned shards decoded across `jobs` worker
+    processes.
+
+    Returns `(data, blocks, corrected, invalid)` as `decode_stream` does.
+    '''
+    (code, header_size) = _parse_header(data[:SHORT_HEADER_SIZE])
+    (d_bits, t_bits) = (code.get_data_bits_len(), code.get_total_bits_len())
+    trailer_size = _trailer_size(code)
+    if len(data) < header_size + trailer_size:
+        raise ValueError('hamming stream is truncated')
+    (trailer, corrected, invalid) = code.decode_bytes(data[len(data)-trailer_size:])
+    length = int.from_bytes(trailer[:LENGTH_SIZE], 'little')
+    shard_size = _shard_multiple(shard_size, t_bits)
+    shards = _shards(header_size, len(data)-trailer_size, shard_size)
+    out = bytearray()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = _map_shards(pool, _decode_shard, ((_size(code), data[a:b]) for (a, b) in shards), _window(jobs))
+        for (result, fixed, bad) in results:
+            out += result
+            (corrected, invalid) = (corrected + fixed, invalid + bad)
+    if length > len(out) or length < len(out) - d_bits:
+        raise ValueError('hamming stream length does not match its data')
+    blocks = (len(data) - header_size)*8 // t_bits
+    return (bytes(out[:length]), blocks, corrected, invalid)
+
+
+def parallel_encode_file(src: str, dst: str, parity_bits: int=None, jobs: int=None, shard_size: int=SHARD_SIZE, data_bits: int=None) -> int:
+    '''
+    Encodes the file at `src` into the file at `dst` with the same contents as
+    `encode_stream`. Each worker process memory-maps its shard of `src` and
+    writes its blocks directly into place in `dst`.
+
+    Returns the number of bytes read from `src`.
+    '''
+    code = _new_code(parity_bits, data_bits)
+    header = _header(code)
+    length = os.path.getsize(src)
+    shard_size = _shard_multiple(shard_size, code.get_data_bits_len())
+    end = len(header) + _encoded_size(code, length)
+    with open(dst, 'wb') as f:
+        f.write(header)
+        f.seek(end)
+        f.write(_trailer(code, length))
+    shards = _shards(0, length, shard_size)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        work = [(_size(code), src, dst, a, b, len(header) + _encoded_size(code, a)) for (a, b) in shards]
+        for _ in _map_shards(pool, _encode_file_shard, work, _window(jobs)):
+            pass
+    return length
+
+
+def parallel_decode_file(src: str, dst: str, jobs: int=None, shard_size: int=SHARD_SIZE) -> Tuple[int, int, int]:
+    '''
+    Decodes the file at `src` written by `encode_stream` into the file at
+    `dst`. Each worker process memory-maps its shard of `src` and writes its
+    data directly into place in `dst`.
+
+    Returns `(blocks, corrected, invalid)` as `decode_stream` does.
+    '''
+    size = os.path.getsize(src)
+    with open(src, 'rb') as f:
+        (code, header_size) = _read_header(f)
+        (d_bits, t_bits) = (code.get_data_bits_len(), code.get_total_bits_len())
+        trailer_size = _trailer_size(code)
+        if size < header_size + trailer_size:
+            raise ValueError('hamming stream is truncated')
+        f.seek(size-trailer_size)
+        (trailer, corrected, invalid) = code.decode_bytes(f.read(trailer_size))
+    length = int.from_bytes(trailer[:LENGTH_SIZE], 'little')
+    payload = size - trailer_size - header_size
+    capacity = (payload // t_bits)*d_bits + ((payload % t_bits)*8 // t_bits)*d_bits // 8
+    if length > capacity or length < capacity - d_bits:
+        raise ValueError('hamming stream length does not match its data')
+    with open(dst, 'wb') as f:
+        f.truncate(length)
+    shard_size = _shard_multiple(shard_size, t_bits)
+    shards = _shards(header_size, size-trailer_size, shard_size)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        work = [(_size(code), src, dst, a, b, ((a-header_size) // t_bits)*d_bits, length) for (a, b) in shards]
+        for (fixed, bad) in _map_shards(pool, _decode_file_shard, work, _window(jobs)):
+            (corrected, invalid) = (corrected + fixed, invalid + bad)
+    return ((size - header_size)*8 // t_bits, corrected, invalid)
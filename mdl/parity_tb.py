@@ -1,4 +1,4 @@
-import hamming
+import bulk
 
 from verb.model import *
 from verb import context
@@ -12,12 +12,18 @@ class Parity:
         self.data = Signal(size)
         self.check_bit = Signal()
 
-    def setup(self):
-        self.data.sample()
+    def setup(self, rng, n: int):
+        self._data = rng.integers(0, 2, size=(n, self.size), dtype='uint8')
 
     def eval(self):
-        result = hamming.set_parity_bit(self.data.get(list), use_even=self.is_even_par)
-        self.check_bit.set(int(result))
+        # same rule as `hamming.set_parity_bit` for every row
+        self._check_bits = (self._data.sum(axis=1) & 1) ^ (self.is_even_par == False)
+
+    def vectors(self):
+        for (data, check_bit) in zip(self._data, self._check_bits):
+            self.data.set(bulk.bits(data))
+            self.check_bit.set(int(check_bit))
+            yield
 
 
 def main():
@@ -25,13 +31,15 @@ def main():
         size=context.generic('SIZE', int),
         even_parity=context.generic('EVEN_PARITY', bool),
     )
+    rng = bulk.rng()
 
     with vectors('inputs.txt', 'i') as inputs, vectors('outputs.txt', 'o') as outputs:
-        for _ in range(1000):
-            mdl.setup()
-            inputs.push(mdl)
+        for n in bulk.batches(bulk.loop_limit()):
+            mdl.setup(rng, n)
             mdl.eval()
-            outputs.push(mdl)
+            for _ in mdl.vectors():
+                inputs.push(mdl)
+                outputs.push(mdl)
 
 
 if __name__ == '__main__':
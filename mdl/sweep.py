@@ -0,0 +1,161 @@
+# File: sweep.py
+# Details:
+#   Measures residual bit-error and block-error rates of the hamming code over
+#   a grid of PARITY_BITS and binary symmetric channel bit-error rates.
+#
+#   Every grid point encodes random messages with `HammingCode.encode_batch`,
+#   passes them through `channel.bsc`, and decodes them with
+#   `HammingCode.decode_batch`. Each decoded block is classified as:
+#
+#       clean        - delivered unchanged with no error flags
+#       corrected    - delivered correctly after a single-bit correction
+#       miscorrected - delivered incorrectly after a "correction"
+#       detected     - rejected as invalid (double-bit error detected)
+#       undetected   - delivered incorrectly without any error flags
+#
+#   The block-error rate (BLER) counts every block that was not delivered
+#   correctly (miscorrected, detected, or undetected). The residual bit-error
+#   rate (BER) counts wrong data bits in delivered (valid) blocks over all
+#   data bits sent.
+#
+#   A point stops early once it has seen `--min-errors` block errors and the
+#   Wilson confidence interval of its BLER is within `--rel-ci` of the
+#   estimate, or once it has sent `--max-blocks` blocks. Grid points run in
+#   parallel across processes.
+#
+#   Usage: `python sweep.py -p 3 4 5 -e 1e-3 1e-2 --output results.csv`
+#
+#   Unit tests are in `test_sweep.py`; run: `python -m unittest test_sweep.py`.
+#
+import argparse
+import csv
+import json
+import os
+import sys
+from math import sqrt
+from typing import List, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from hamming import HammingCode
+import channel
+
+# z-score for a two-sided 95% confidence interval
+Z_95 = 1.959964
+
+FIELDS = [
+    'parity_bits', 'code_rate', 'p', 'blocks', 'clean', 'corrected', 'miscorrected',
+    'detected', 'undetected', 'bit_errors', 'ber', 'bler', 'bler_low', 'bler_high',
+]
+
+
+def wilson(failures: int, trials: int, z: float=Z_95) -> Tuple[float, float]:
+    '''
+    Computes the Wilson score interval `(low, high)` for a binomial proportion.
+    '''
+    if trials == 0:
+        return (0.0, 1.0)
+    p = failures / trials
+    denom = 1 + z**2/trials
+    center = (p + z**2/(2*trials)) / denom
+    half = z * sqrt(p*(1-p)/trials + z**2/(4*trials**2)) / denom
+    return (max(0.0, center-half), min(1.0, center+half))
+
+
+def run_point(parity_bits: int, p: float, seed=None, batch: int=100_000, max_blocks: int=10_000_000, min_errors: int=100, rel_ci: float=0.1) -> Dict:
+    '''
+    Measures the decoder outcomes for one grid point.
+
+    Returns a dictionary with a value for each of `FIELDS`.
+    '''
+    code = HammingCode(parity_bits)
+    rng = np.random.default_rng(seed)
+    d_bits = code.get_data_bits_len()
+    counts = dict.fromkeys(['blocks', 'clean', 'corrected', 'miscorrected', 'detected', 'undetected', 'bit_errors'], 0)
+    while counts['blocks'] < max_blocks:
+        n = min(batch, max_blocks - counts['blocks'])
+        data = rng.integers(0, 2, size=(n, d_bits), dtype=np.uint8)
+        (received, _) = channel.bsc(code.encode_batch(data), p, rng)
+        (messages, corrected, valid) = code.decode_batch(received)
+        errors = np.count_nonzero(messages != data, axis=1)
+        wrong = errors > 0
+        counts['blocks'] += n
+        counts['clean'] += int(np.count_nonzero(valid & ~corrected & ~wrong))
+        counts['corrected'] += int(np.count_nonzero(valid & corrected & ~wrong))
+        counts['miscorrected'] += int(np.count_nonzero(valid & corrected & wrong))
+        counts['detected'] += int(np.count_nonzero(~valid))
+        counts['undetected'] += int(np.count_nonzero(valid & ~corrected & wrong))
+        counts['bit_errors'] += int(errors[valid].sum())
+        failures = counts['blocks'] - counts['clean'] - counts['corrected']
+        (low, high) = wilson(failures, counts['blocks'])
+        if failures >= min_errors and (high-low)/2 <= rel_ci * failures/counts['blocks']:
+            break
+    failures = counts['blocks'] - counts['clean'] - counts['corrected']
+    (low, high) = wilson(failures, counts['blocks'])
+    result = {
+        'parity_bits': parity_bits,
+        'code_rate': d_bits / code.get_total_bits_len(),
+        'p': p,
+    }
+    result.update(counts)
+    result['ber'] = counts['bit_errors'] / (counts['blocks']*d_bits)
+    result['bler'] = failures / counts['blocks']
+    (result['bler_low'], result['bler_high']) = (low, high)
+    return result
+
+
+def sweep(parity_bits: List[int], rates: List[float], seed=None, jobs: int=None, **kwargs) -> List[Dict]:
+    '''
+    Runs `run_point` for every combination of `parity_bits` and channel
+    bit-error `rates` across `jobs` worker processes.
+
+    Each point receives an independent random stream spawned from `seed`.
+    '''
+    points = [(pb, p) for pb in parity_bits for p in rates]
+    seeds = np.random.SeedSequence(seed).spawn(len(points))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_point, pb, p, s, **kwargs) for ((pb, p), s) in zip(points, seeds)]
+        return [f.result() for f in futures]
+
+
+def save(results: List[Dict], path: str):
+    '''
+    Writes the `results` to `path` as JSON if it ends in '.json', otherwise as
+    CSV ('-' writes CSV to stdout).
+    '''
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    f = sys.stdout if path == '-' else open(path, 'w', newline='')
+    writer = csv.DictWriter(f, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+    if f is not sys.stdout:
+        f.close()
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='sweep', description='Measure hamming-code BER/BLER over a grid of parity bits and error rates')
+    parser.add_argument('--parity-bits', '-p', type=int, nargs='+', default=list(range(2, 9)), metavar='NUM', help='numbers of parity bits (default: 2 to 8)')
+    parser.add_argument('--error-rates', '-e', type=float, nargs='+', default=[1e-4, 1e-3, 1e-2, 1e-1], metavar='P', help='channel bit-error rates')
+    parser.add_argument('--seed', type=int, default=None, help='set the randomness seed')
+    parser.add_argument('--batch', type=int, default=100_000, metavar='NUM', help='number of blocks simulated at once')
+    parser.add_argument('--max-blocks', type=int, default=10_000_000, metavar='NUM', help='maximum number of blocks per point')
+    parser.add_argument('--min-errors', type=int, default=100, metavar='NUM', help='minimum number of block errors before stopping early')
+    parser.add_argument('--rel-ci', type=float, default=0.1, metavar='FRAC', help='stop once the BLER confidence half-width is within this fraction')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), metavar='NUM', help='number of worker processes')
+    parser.add_argument('--output', '-o', default='-', help='CSV or .json file to write (default: CSV to stdout)')
+    args = parser.parse_args()
+
+    results = sweep(
+        args.parity_bits, args.error_rates, seed=args.seed, jobs=args.jobs,
+        batch=args.batch, max_blocks=args.max_blocks, min_errors=args.min_errors, rel_ci=args.rel_ci,
+    )
+    save(results, args.output)
+    pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# File: test_bench.py
+# Details:
+#   Unit tests for the benchmark suite.
+#
+#   To execute the tests, run: `python -m unittest test_bench.py`.
+#
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+import hamming
+from bench import PATHS, percentile, cases, run, compare, import_time, compare_imports
+
+
+# --- Tests --------------------------------------------------------------------
+
+class TestBench(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([3.0], 90), 3.0)
+        pass
+
+
+    def test_cases(self):
+        listed = cases(['int', 'lookup', 'send'], [3], ['clean', 'double'])
+        self.assertEqual(listed, [
+            ('encode', 'int', 3, 'none'), ('decode', 'int', 3, 'clean'), ('decode', 'int', 3, 'double'),
+            ('decode', 'lookup', 3, 'clean'), ('decode', 'lookup', 3, 'double'),
+            ('send', 'send', 3, 'clean'), ('send', 'send', 3, 'double'),
+        ])
+        # the lookup table is too large past LOOKUP_LIMIT
+        self.assertEqual(cases(['lookup'], [hamming.LOOKUP_LIMIT+1], ['clean']), [])
+        pass
+
+
+    def test_run(self):
+        report = run(PATHS, [2, 5], ['mixed'], n=50, min_time=0.0, seed=1, import_runs=0)
+        self.assertEqual(len(report['results']), len(cases(PATHS, [2, 5], ['mixed'])))
+        for r in report['results']:
+            self.assertGreater(r['blocks_per_s'], 0)
+            self.assertTrue(r['p50_us'] <= r['p90_us'] <= r['p99_us'])
+        pass
+
+
+    def test_compare(self):
+        baseline = run(['int'], [3], ['single'], n=20, min_time=0.0, seed=1, import_runs=0)
+        current = json.loads(json.dumps(baseline))
+        current['results'][0]['blocks_per_s'] *= 0.5
+        current['results'][1]['blocks_per_s'] *= 0.95
+        comparisons = compare(current, baseline, threshold=0.1)
+        self.assertEqual([c['regressed'] for c in comparisons], [True, False])
+        self.assertAlmostEqual(comparisons[0]['change'], -0.5)
+        pass
+
+
+    def test_import_time(self):
+        result = import_time('hamming', runs=1)
+        self.assertGreater(result['us'], 0)
+        # the core model does not load its backends or the test framework
+        self.assertEqual(subprocess.run(
+            [sys.executable, '-c', 'import sys, hamming; assert not {"numpy", "unittest", "concurrent.futures"} & set(sys.modules)'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).returncode, 0)
+        # neither do the tools built on it
+        self.assertEqual(subprocess.run(
+            [sys.executable, '-c', 'import sys, channel, sweep, bench; assert "unittest" not in sys.modules'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).returncode, 0)
+        baseline = {'imports': [dict(result, us=result['us']/2)]}
+        self.assertTrue(compare_imports({'imports': [result]}, baseline)[0]['regressed'])
+        pass
+
+    pass
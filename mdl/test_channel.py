@@ -0,0 +1,52 @@
+# File: test_channel.py
+# Details:
+#   Unit tests for the vectorized channel models.
+#
+#   To execute the tests, run: `python -m unittest test_channel.py`.
+#
+import unittest
+import numpy as np
+
+from channel import flip, bsc, burst
+
+
+# --- Tests --------------------------------------------------------------------
+
+class TestChannel(unittest.TestCase):
+
+    def test_flip(self):
+        blocks = np.zeros((1000, 16), dtype=np.uint8)
+        (received, masks) = flip(blocks, 2, rng=0)
+        self.assertTrue(np.all(masks.sum(axis=1) == 2))
+        self.assertTrue(np.array_equal(received, masks))
+        # per-block number of flips
+        k = np.arange(0, 1000) % 17
+        (_, masks) = flip(blocks, k, rng=1)
+        self.assertTrue(np.array_equal(masks.sum(axis=1), k))
+        # seeded runs are reproducible
+        self.assertTrue(np.array_equal(flip(blocks, 3, rng=2)[1], flip(blocks, 3, rng=2)[1]))
+        with self.assertRaises(ValueError):
+            flip(blocks, 17)
+        pass
+
+
+    def test_bsc(self):
+        blocks = np.ones((10000, 32), dtype=np.uint8)
+        (received, masks) = bsc(blocks, 0.1, rng=0)
+        self.assertTrue(np.array_equal(received, 1 - masks))
+        self.assertAlmostEqual(masks.mean(), 0.1, delta=0.005)
+        self.assertEqual(bsc(blocks, 0.0)[1].sum(), 0)
+        pass
+
+
+    def test_burst(self):
+        blocks = np.zeros((1000, 32), dtype=np.uint8)
+        (_, masks) = burst(blocks, 5, rng=0)
+        for row in masks:
+            positions = np.nonzero(row)[0]
+            self.assertEqual(positions[-1] - positions[0], 4)
+        (_, masks) = burst(blocks, 4, rng=0, density=1.0)
+        self.assertTrue(np.all(masks.sum(axis=1) == 4))
+        pass
+
+    pass
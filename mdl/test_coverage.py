@@ -0,0 +1,54 @@
+# File: test_coverage.py
+# Details:
+#   Unit tests for the directed error-coverage stimulus.
+#
+#   To execute the tests, run: `python -m unittest test_coverage.py`.
+#
+import unittest
+
+from coverage import reachable_syndromes, ErrorCoverage, directed_errors
+
+# --- Tests --------------------------------------------------------------------
+
+class TestCoverage(unittest.TestCase):
+
+    def test_reachable_syndromes(self):
+        # every syndrome of a full block is reachable by 3 or 4 flips
+        self.assertEqual(reachable_syndromes(16, 3), set(range(0, 16)))
+        self.assertEqual(reachable_syndromes(16, 4), set(range(0, 16)))
+        # the only 4-bit pattern of a 4-bit block flips every bit
+        self.assertEqual(reachable_syndromes(4, 4), {0})
+        self.assertEqual(reachable_syndromes(4, 3), {0, 1, 2, 3})
+        self.assertEqual(reachable_syndromes(3, 4), set())
+        # a shortened block cannot reach every syndrome
+        self.assertEqual(reachable_syndromes(5, 3), {0, 1, 2, 3, 5, 6, 7})
+        pass
+
+
+    def test_error_coverage(self):
+        coverage = ErrorCoverage(4)
+        self.assertEqual(coverage.goals, {'clean': 1, 'single': 4, 'double': 6, 'triple': 4, 'quad': 1})
+        self.assertEqual(coverage.cover('quad', 0), True)
+        self.assertEqual(coverage.cover('quad', 0), False)
+        self.assertEqual(coverage.is_complete('quad'), True)
+        self.assertEqual(coverage.is_complete('triple'), False)
+        self.assertEqual(str(coverage), 'clean 0/1, single 0/4, double 0/6, triple 0/4, quad 1/1')
+        pass
+
+
+    def test_directed_errors(self):
+        for t_bits in [4, 8, 13, 16, 39]:
+            coverage = ErrorCoverage(t_bits)
+            patterns = list(directed_errors(t_bits, coverage, rng=0))
+            # every class is covered by exactly one pattern
+            for kind in coverage.goals:
+                self.assertEqual(coverage.is_complete(kind), True)
+            self.assertEqual(len(patterns), sum(coverage.goals.values()))
+            for spots in patterns:
+                self.assertEqual(len(set(spots)), len(spots))
+                self.assertTrue(all(0 <= s < t_bits for s in spots))
+            # the small classes come first
+            self.assertEqual(patterns[:t_bits+1], [()] + [(i,) for i in range(0, t_bits)])
+        pass
+
+    pass
@@ -0,0 +1,457 @@
+# File: test_hamming.py
+# Details:
+#   Unit tests for the hamming model and its batch and parallel backends.
+#
+#   Kept apart from `hamming.py` so importing the model does not load
+#   `unittest`.
+#
+#   To execute the tests, run: `python -m unittest test_hamming.py`.
+#
+import unittest
+import random
+import os
+
+from hamming import *
+from hamming import _binary_space
+from hamming import HEADER_SIZE, MAGIC, SHORT_MAGIC
+
+# --- Tests --------------------------------------------------------------------
+
+# unit tests for various hamming functions
+class TestHammingEcc(unittest.TestCase):
+
+    def test_smoke(self):
+        # the default code round trips a message without errors
+        code = HammingCode(PARITY_BITS)
+        message = [random.randint(0, 1) for _ in range(0, DATA_BITS)]
+        self.assertEqual(code.decode(code.encode(message.copy())), (message, False, True))
+        pass
+
+
+    def test_bin_space(self):
+        space = _binary_space(2**1)
+        self.assertEqual(space, ['0', '1'])
+
+        space = _binary_space(2**2)
+        self.assertEqual(space, ['00', '01', '10', '11'])
+
+        space = _binary_space(2**3)
+        self.assertEqual(space, [
+            '000', '001', '010', '011',
+            '100', '101', '110', '111'
+        ])
+        pass
+
+
+    def test_send(self):
+        # flip 1 location
+        message = [0, 1, 1]
+        send(message, spots=[0])
+        self.assertEqual(message, [1, 1, 1])
+        # flip 2 locations
+        message = [0, 1, 1]
+        send(message, spots=[0, 2])
+        self.assertEqual(message, [1, 1, 0])
+        # flip 1 bit
+        message = [0, 1, 1, 0]
+        send(message, noise=1)
+        self.assertNotEqual(message, [0, 1, 1, 0])
+        # flip 0 bits
+        message = [0, 1, 1, 0]
+        send(message, noise=0, spots=[])
+        self.assertEqual(message, [0, 1, 1, 0])
+        # flip all bits without leaking positions between calls
+        for _ in range(0, 2):
+            message = [0, 1, 1, 0]
+            send(message, noise=4)
+            self.assertEqual(message, [1, 0, 0, 1])
+        pass
+
+
+    def test_get_parity_coverage(self):
+        code = HammingCode(3)
+        self.assertEqual(code._get_parity_coverage(0), [1, 3, 5, 7])
+        self.assertEqual(code._get_parity_coverage(1), [2, 3, 6, 7])
+        self.assertEqual(code._get_parity_coverage(2), [4, 5, 6, 7])
+        # tables are shared between codes of the same size
+        self.assertIs(code._tables, HammingCode(3)._tables)
+        self.assertEqual(code._tables.data_positions, (3, 5, 6, 7))
+        self.assertEqual(code._tables.parity_positions, (0, 1, 2, 4))
+        pass
+
+
+    def test_encode_decode(self):
+        for p in range(2, 7):
+            code = HammingCode(p)
+            for _ in range(0, 20):
+                message = [random.randint(0, 1) for _ in range(0, code.get_data_bits_len())]
+                block = code.encode(message.copy())
+                self.assertEqual(len(block), code.get_total_bits_len())
+                self.assertEqual(set_parity_bit(block), 0)
+                # zero errors
+                self.assertEqual(code.decode(block.copy()), (message, False, True))
+                # single-bit error
+                flip = random.randint(0, len(block)-1)
+                self.assertEqual(code.decode(send(block.copy(), spots=[flip])), (message, True, True))
+                # double-bit error
+                spots = random.sample(range(0, len(block)), 2)
+                (_, corrected, valid) = code.decode(send(block.copy(), spots=spots))
+                self.assertEqual((corrected, valid), (False, False))
+        pass
+
+
+    def test_encode_decode_int(self):
+        for p in range(2, 9):
+            code = HammingCode(p)
+            for _ in range(0, 20):
+                message = [random.randint(0, 1) for _ in range(0, code.get_data_bits_len())]
+                data = sum(b << i for (i, b) in enumerate(message))
+                block = code.encode(message.copy())
+                packed = code.encode_int(data)
+                self.assertEqual(packed, sum(b << i for (i, b) in enumerate(block)))
+                # match the list decoder for 0 to 3 flipped bits
+                noisy = send(block.copy(), noise=random.randint(0, 3), spots=[])
+                (msg, corrected, valid) = code.decode(noisy.copy())
+                result = code.decode_int(sum(b << i for (i, b) in enumerate(noisy)))
+                self.assertEqual(result, (sum(b << i for (i, b) in enumerate(msg)), corrected, valid))
+        pass
+
+
+    def test_block(self):
+        # views share the bits without copying
+        buf = bytearray([0b0000_0110, 0b1])
+        block = Block.from_bytes(buf, 9)
+        self.assertEqual(block.tolist(), [0, 1, 1, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(str(block.msb()), '100000110')
+        block.msb()[0] = 0
+        block[0] = 1
+        self.assertEqual(buf, bytearray([0b0000_0111, 0]))
+        self.assertEqual(block.memoryview().obj, buf)
+        self.assertEqual(Block.from_list([1, 0, 0], msb_first=True).to_int(), 4)
+        # read-only buffers are copied on the first write
+        data = bytes([0xFF])
+        block = Block.from_bytes(data)
+        block[7] = 0
+        self.assertEqual((data, bytes(block)), (bytes([0xFF]), bytes([0x7F])))
+        self.assertRaises(IndexError, lambda: block[8])
+        pass
+
+
+    def test_encode_decode_block(self):
+        for p in range(2, 9):
+            code = HammingCode(p)
+            for _ in range(0, 20):
+                data = random.getrandbits(code.get_data_bits_len())
+                buf = bytearray((code.get_total_bits_len()+7) // 8)
+                message = Block(code.get_data_bits_len(), buf)
+                message._assign(data, code.get_data_bits_len())
+                # parity is inserted in place
+                block = code.encode(message)
+                self.assertTrue(block is message)
+                self.assertEqual(int.from_bytes(buf, 'little'), code.encode_int(data))
+                self.assertEqual(block, code.encode([(data >> i) & 1 for i in range(0, code.get_data_bits_len())]))
+                # decode a read-only copy with a single-bit error
+                received = Block.from_bytes(bytes(send(block, spots=[random.randrange(0, len(block))])), len(block))
+                self.assertEqual(code.decode(received), (Block.from_int(data, code.get_data_bits_len()), True, True))
+        self.assertRaises(ValueError, lambda: HammingCode(3).encode(Block(3)))
+        # a bytearray with room for the block is never resized
+        code = HammingCode(3)
+        buf = bytearray(1)
+        message = Block(4, buf)
+        message._assign(0b1011, 4)
+        with message.memoryview() as view:
+            code.encode(message)
+            self.assertEqual(view[0], code.encode_int(0b1011))
+        # a short bytearray grows unless a view of it is exported
+        code = HammingCode(data_bits=8)
+        message = Block.from_int(0xA5, 8)
+        view = message.memoryview()
+        self.assertRaises(ValueError, lambda: code.encode(message))
+        self.assertEqual(message.to_int(), 0xA5)
+        view.release()
+        self.assertEqual(code.encode(message).to_int(), code.encode_int(0xA5))
+        pass
+
+
+    def test_pipeline(self):
+        code = HammingCode(4)
+        for stages in [[True, True, True], [True, False, True], [False, False, False]]:
+            pipe = HammingPipeline(code, decode=True, stages=stages)
+            latency = pipe.get_latency()
+            self.assertEqual(latency, sum(stages))
+            # a free-flowing pipeline presents each result after its latency
+            blocks = [random.getrandbits(code.get_total_bits_len()) for _ in range(0, 20)]
+            for (t, block) in enumerate(blocks):
+                (in_ready, out_valid, result) = pipe.step(True, block, True)
+                self.assertTrue(in_ready)
+                self.assertEqual(out_valid, t >= latency)
+                if t >= latency:
+                    self.assertEqual(result, code.decode_int(blocks[t-latency]))
+            # a stalled output fills every stage before pushing back
+            pipe.reset()
+            readies = [pipe.step(True, 0, False)[0] for _ in range(0, latency+2)]
+            self.assertEqual(readies, [True]*latency + [False]*2)
+            self.assertEqual(pipe.accepted, latency)
+        # random handshakes deliver every accepted block in order
+        pipe = HammingPipeline(code, stages=[True, True])
+        (sent, received) = ([], [])
+        for _ in range(0, 500):
+            data = random.getrandbits(code.get_data_bits_len())
+            (in_valid, out_ready) = (random.random() < 0.7, random.random() < 0.7)
+            (in_ready, out_valid, result) = pipe.step(in_valid, data, out_ready)
+            if in_valid and in_ready:
+                sent += [code.encode_int(data)]
+            if out_valid and out_ready:
+                received += [result]
+        self.assertEqual(received, sent[:len(received)])
+        self.assertLessEqual(len(sent) - len(received), pipe.get_latency())
+        self.assertAlmostEqual(pipe.get_throughput(), len(received) / 500)
+        self.assertRaises(ValueError, lambda: HammingPipeline(code, stages=[True]))
+        pass
+
+
+    def test_encode_decode_batch(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        rng = np.random.default_rng(0)
+        for p in range(2, 9):
+            code = HammingCode(p)
+            data = rng.integers(0, 2, size=(64, code.get_data_bits_len()), dtype=np.uint8)
+            blocks = code.encode_batch(data)
+            for (message, block) in zip(data, blocks):
+                self.assertEqual(block.tolist(), code.encode(message.tolist()))
+            # flip 0 to 3 bits of each block
+            noisy = blocks.copy()
+            for row in noisy:
+                row[rng.choice(len(row), size=rng.integers(0, 4), replace=False)] ^= 1
+            (messages, corrected, valid) = code.decode_batch(noisy)
+            for (k, block) in enumerate(noisy):
+                self.assertEqual((messages[k].tolist(), bool(corrected[k]), bool(valid[k])), code.decode(block.tolist()))
+        pass
+
+
+    def test_syndrome_table(self):
+        tables = HammingCode(3)._tables
+        self.assertEqual(len(tables.syndromes), 2**4)
+        self.assertEqual(tables.syndromes[0], (-1, False, True))
+        self.assertEqual(tables.syndromes[5], (-1, False, False))
+        self.assertEqual(tables.syndromes[8], (0, True, True))
+        self.assertEqual(tables.syndromes[8+6], (6, True, True))
+        self.assertEqual(tables.flip_masks[8+6], 1 << 6)
+        pass
+
+
+    def test_decode_lookup(self):
+        for p in range(2, LOOKUP_LIMIT+1):
+            code = HammingCode(p)
+            fast = HammingCode(p, lookup=True)
+            for block in range(0, 2**code.get_total_bits_len()):
+                self.assertEqual(fast.decode_int(block), code.decode_int(block))
+        with self.assertRaises(ValueError):
+            HammingCode(LOOKUP_LIMIT+1, lookup=True)
+        pass
+
+
+    def test_ipartition(self):
+        chunks = ipartition([1, 0, 1, 1, 0], size=2)
+        self.assertEqual(next(chunks), [1, 0])
+        self.assertEqual(list(chunks), [[1, 1], [0, 0]])
+        self.assertEqual(partition([1] * DATA_BITS), [[1] * DATA_BITS])
+        pass
+
+
+    def test_stream(self):
+        import io
+        for p in range(2, 8):
+            for length in [0, 1, 7, 63, 64, 1000]:
+                data = bytes(random.getrandbits(8) for _ in range(0, length))
+                encoded = io.BytesIO()
+                self.assertEqual(encode_stream(io.BytesIO(data), encoded, p, buffer_size=64), length)
+                # flip a single bit in the payload
+                packet = bytearray(encoded.getvalue())
+                if length > 0:
+                    packet[HEADER_SIZE] ^= 0x01
+                decoded = io.BytesIO()
+                (blocks, corrected, invalid) = decode_stream(io.BytesIO(bytes(packet)), decoded, buffer_size=64)
+                self.assertEqual(decoded.getvalue(), data)
+                self.assertEqual((corrected, invalid), (int(length > 0), 0))
+                self.assertEqual(blocks, (len(packet)-HEADER_SIZE)*8 // 2**p)
+        # headers naming a code outside the supported sizes are rejected
+        for header in [MAGIC + b'\x00', MAGIC + b'\x01', MAGIC + b'\x30', SHORT_MAGIC + b'\x30' + (2**32-1).to_bytes(4, 'little')]:
+            with self.assertRaisesRegex(ValueError, 'invalid hamming stream header'):
+                decode_stream(io.BytesIO(header + bytes(16)), io.BytesIO())
+        for p in [0, 1, MAX_PARITY_BITS+1]:
+            with self.assertRaises(ValueError):
+                HammingCode(p)
+        pass
+
+
+    def test_main(self):
+        import io, sys, tempfile
+        data = bytes(random.getrandbits(8) for _ in range(0, 100))
+        stdout = sys.stdout
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'data.bin')
+                with open(path, 'wb') as f:
+                    f.write(data)
+                # stdout stays open after writing the blocks to it
+                sys.stdout = io.TextIOWrapper(io.BytesIO())
+                main(['encode', path])
+                self.assertEqual(sys.stdout.buffer.closed, False)
+                encoded = sys.stdout.buffer.getvalue()
+        finally:
+            sys.stdout = stdout
+        decoded = io.BytesIO()
+        decode_stream(io.BytesIO(encoded), decoded)
+        self.assertEqual(decoded.getvalue(), data)
+        pass
+
+
+    def test_parallel(self):
+        import io, tempfile
+        from hamming_parallel import parallel_encode, parallel_decode, parallel_encode_file, parallel_decode_file
+        for p in [2, 3, 5]:
+            for length in [0, 5, 1000]:
+                data = bytes(random.getrandbits(8) for _ in range(0, length))
+                expected = io.BytesIO()
+                encode_stream(io.BytesIO(data), expected, p)
+                encoded = parallel_encode(data, p, jobs=2, shard_size=64)
+                self.assertEqual(encoded, expected.getvalue())
+                self.assertEqual(parallel_decode(encoded, jobs=2, shard_size=64)[0], data)
+                with tempfile.TemporaryDirectory() as tmp:
+                    paths = [os.path.join(tmp, name) for name in ['src', 'enc', 'dec']]
+                    with open(paths[0], 'wb') as f:
+                        f.write(data)
+                    parallel_encode_file(paths[0], paths[1], p, jobs=2, shard_size=64)
+                    with open(paths[1], 'rb') as f:
+                        self.assertEqual(f.read(), encoded)
+                    (_, corrected, invalid) = parallel_decode_file(paths[1], paths[2], jobs=2, shard_size=64)
+                    with open(paths[2], 'rb') as f:
+                        self.assertEqual(f.read(), data)
+                    self.assertEqual((corrected, invalid), (0, 0))
+        # shortened codes are rebuilt in the workers
+        data = bytes(random.getrandbits(8) for _ in range(0, 1000))
+        encoded = parallel_encode(data, jobs=2, shard_size=64, data_bits=32)
+        self.assertEqual(encoded[:len(SHORT_MAGIC)], SHORT_MAGIC)
+        self.assertEqual(parallel_decode(encoded, jobs=2, shard_size=64)[0], data)
+        # a failing shard stops the work that is still pending
+        from concurrent.futures import ProcessPoolExecutor
+        from hamming_parallel import _map_shards
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results = _map_shards(pool, int, [(str(i),) for i in range(0, 3)] + [('x',)] + [(str(i),) for i in range(0, 100)], 4)
+            self.assertEqual([next(results) for _ in range(0, 3)], [0, 1, 2])
+            with self.assertRaises(ValueError):
+                next(results)
+        pass
+
+
+    def test_scrub(self):
+        import tempfile
+        try:
+            from hamming_batch import scrub
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        for p in [2, 3, 5]:
+            code = HammingCode(p)
+            t_bits = code.get_total_bits_len()
+            encoded = bytearray(code.encode_bytes(bytes(random.getrandbits(8) for _ in range(0, 200))))
+            clean = bytes(encoded)
+            # single-bit errors in block 0 and block 5, double-bit error in block 3
+            for bit in [1, 5*t_bits+2, 3*t_bits, 3*t_bits+1]:
+                encoded[bit // 8] ^= 1 << (bit % 8)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'image')
+                with open(path, 'wb') as f:
+                    f.write(b'\xff' + encoded)
+                report = scrub(path, p, offset=1, dry_run=True, window_size=16)
+                self.assertEqual((report.blocks, report.corrected), (len(clean)*8 // t_bits, 2))
+                self.assertEqual(report.invalid, [1 + (3*t_bits) // 8])
+                report = scrub(path, p, offset=1, window_size=16)
+                with open(path, 'rb') as f:
+                    fixed = f.read()
+                # only the double-bit error is left
+                self.assertEqual(fixed[0], 0xff)
+                (data, _, invalid) = code.decode_bytes(encoded)
+                self.assertEqual(code.decode_bytes(fixed[1:]), (data, 0, invalid))
+                self.assertEqual(scrub(path, p, offset=1).corrected, 0)
+        pass
+
+
+    def test_verify_secded(self):
+        try:
+            from hamming_batch import verify_secded
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        for p in range(2, 9):
+            t_bits = total_bits(p)
+            count = verify_secded(p)
+            self.assertEqual(count, 5 * (t_bits + t_bits*(t_bits-1) // 2))
+        # checks the default code
+        t_bits = total_bits(PARITY_BITS)
+        self.assertEqual(verify_secded(), 5 * (t_bits + t_bits*(t_bits-1) // 2))
+        # checks shortened codes
+        for k in [1, 5, 32, 40, 64]:
+            verify_secded(data_bits=k)
+        pass
+
+
+    def test_shortened(self):
+        import io
+        self.assertEqual([min_parity_bits(k) for k in [1, 4, 5, 11, 12, 32, 57, 58, 64]], [2, 3, 4, 4, 5, 6, 6, 7, 7])
+        code = HammingCode(data_bits=32)
+        self.assertEqual((code.get_parity_bits_len(), code.get_total_bits_len(), code.is_shortened()), (6, 39, True))
+        self.assertEqual(HammingCode(6, data_bits=57).is_shortened(), False)
+        # the parity bits must be the fewest that fit the data bits
+        with self.assertRaises(ValueError):
+            HammingCode(7, data_bits=32)
+        with self.assertRaises(ValueError):
+            HammingCode(6, data_bits=58)
+        for k in [1, 5, 12, 32, 40, 64]:
+            code = HammingCode(data_bits=k)
+            t_bits = code.get_total_bits_len()
+            for _ in range(0, 20):
+                message = [random.randint(0, 1) for _ in range(0, k)]
+                block = code.encode(message.copy())
+                self.assertEqual(len(block), t_bits)
+                # the shortened block is the full block without its zero tail
+                full = HammingCode(code.get_parity_bits_len())
+                self.assertEqual(block, full.encode(message + [0]*(full.get_data_bits_len()-k))[:t_bits])
+                packed = sum(b << i for (i, b) in enumerate(message))
+                self.assertEqual(code.encode_int(packed), sum(b << j for (j, b) in enumerate(block)))
+                spot = random.randrange(0, t_bits)
+                self.assertEqual(code.decode(send(block.copy(), spots=[spot])), (message, True, True))
+                self.assertEqual(code.decode_int(code.encode_int(packed) ^ (1 << spot)), (packed, True, True))
+            # syndromes pointing past the end of the block are uncorrectable
+            for s in range(t_bits, 2**code.get_parity_bits_len()):
+                self.assertEqual(code._tables.syndromes[(1 << code.get_parity_bits_len()) | s], (-1, False, False))
+            data = bytes(random.getrandbits(8) for _ in range(0, 100))
+            encoded = io.BytesIO()
+            encode_stream(io.BytesIO(data), encoded, data_bits=k)
+            header = SHORT_MAGIC + bytes([code.get_parity_bits_len()]) + k.to_bytes(4, 'little') if k > 1 else MAGIC + b'\x02'
+            self.assertEqual(encoded.getvalue()[:len(header)], header)
+            decoded = io.BytesIO()
+            decode_stream(io.BytesIO(encoded.getvalue()), decoded)
+            self.assertEqual(decoded.getvalue(), data)
+        pass
+
+
+    def test_compute_parity(self):
+        # even parity
+        check = set_parity_bit([1, 0, 0])
+        self.assertEqual(check, 1)
+
+        check = set_parity_bit([1, 0, 0, 1])
+        self.assertEqual(check, 0)
+
+        # odd parity
+        check = set_parity_bit([1, 0, 0, 1], use_even=False)
+        self.assertEqual(check, 1)
+
+        check = set_parity_bit([1, 0, 1, 1], use_even=False)
+        self.assertEqual(check, 0)
+        pass
+
+    pass
@@ -0,0 +1,41 @@
+# File: test_sweep.py
+# Details:
+#   Unit tests for the BER/BLER sweep.
+#
+#   To execute the tests, run: `python -m unittest test_sweep.py`.
+#
+import unittest
+from sweep import wilson, run_point, sweep
+
+
+# --- Tests --------------------------------------------------------------------
+
+class TestSweep(unittest.TestCase):
+
+    def test_wilson(self):
+        (low, high) = wilson(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+        self.assertEqual(wilson(0, 0), (0.0, 1.0))
+        pass
+
+
+    def test_run_point(self):
+        # a noiseless channel never fails
+        result = run_point(3, 0.0, seed=0, batch=1000, max_blocks=5000)
+        self.assertEqual((result['blocks'], result['clean'], result['bler']), (5000, 5000, 0.0))
+        # a noisy channel stops early once the estimate is tight
+        result = run_point(4, 0.05, seed=0, batch=1000, max_blocks=1_000_000, min_errors=50)
+        self.assertLess(result['blocks'], 1_000_000)
+        self.assertEqual(sum(result[k] for k in ['clean', 'corrected', 'miscorrected', 'detected', 'undetected']), result['blocks'])
+        self.assertTrue(result['bler_low'] <= result['bler'] <= result['bler_high'])
+        pass
+
+
+    def test_sweep(self):
+        results = sweep([2, 3], [0.01], seed=1, jobs=2, batch=1000, max_blocks=2000)
+        self.assertEqual([(r['parity_bits'], r['p']) for r in results], [(2, 0.01), (3, 0.01)])
+        self.assertEqual(results, sweep([2, 3], [0.01], seed=1, jobs=1, batch=1000, max_blocks=2000))
+        pass
+
+    pass
@@ -0,0 +1,72 @@
+-- Computes the check bits of a full hamming-code block `data`, where check
+-- bit `ii` is the even parity of every position whose index has bit `ii` set.
+--
+-- For a block with its parity bits cleared, the check bits are the parity
+-- bits to insert (encoding). For a received block, they are the address of
+-- an erroneous bit (decoding).
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+library work;
+use work.hamm_pkg.all;
+
+entity hamm_check is
+    generic (
+        --! number of parity bits in the block (excluding 0th DED bit)
+        PARITY_BITS : positive range 2 to positive'high
+    );
+    port (
+        data       : in  logics(block_size(PARITY_BITS)-1 downto 0);
+        check_bits : out logics(PARITY_BITS-1 downto 0)
+    );
+end entity hamm_check;
+
+
+architecture rtl of hamm_check is
+    constant EVEN_PARITY : boolean := true;
+
+    constant TOTAL_BITS_SIZE  : positive := block_size(PARITY_BITS);
+    constant PARITY_LINE_SIZE : positive := TOTAL_BITS_SIZE/2;
+
+    type hamm_block is array (0 to PARITY_BITS-1) of logics(PARITY_LINE_SIZE-1 downto 0);
+
+    signal lines : hamm_block;
+
+begin
+
+    --! divide the entire hamming-code block into parity subset groups
+    process(data)
+        variable temp_line : logics(PARITY_LINE_SIZE-1 downto 0);
+        variable index     : logics(PARITY_BITS-1 downto 0);
+    begin
+        for ii in PARITY_BITS-1 downto 0 loop
+            temp_line := (others => '0');
+            for jj in TOTAL_BITS_SIZE-1 downto 0 loop 
+                -- decode the parity bit index
+                index := logics(to_unsigned(jj, PARITY_BITS));
+
+                if index(ii) = '1' then 
+                    -- insert new bit
+                    temp_line := temp_line(PARITY_LINE_SIZE-2 downto 0) & data(jj);
+                end if;
+            end loop;
+            -- drive the ii'th vector in the block as this parity's subset of bits
+            lines(ii) <= temp_line;
+        end loop;
+    end process;
+
+    --! instantiate parity checkers for the subset of bits to evaluate
+    gen_check_bits: for ii in 0 to PARITY_BITS-1 generate
+        u_par : entity work.parity
+        generic map (
+            SIZE        => PARITY_LINE_SIZE,
+            EVEN_PARITY => EVEN_PARITY
+        ) port map (
+            data      => lines(ii),
+            check_bit => check_bits(ii)
+        );
+    end generate gen_check_bits;
+
+end architecture rtl;
@@ -0,0 +1,190 @@
+-- Pipelined hamming-code decoder that takes each block `encoding` and decodes
+-- it with corresponding parity bits into a `message` from extended hamming
+-- code (SECDED).
+--
+-- Computes the same outputs as `hamm_dec` in three stages that can each be
+-- followed by a register:
+--
+--   1. syndrome   - computes the error address and the overall parity
+--   2. correction - flips the addressed bit and sets the error flags
+--   3. extraction - removes the parity bits to reveal the message
+--
+-- The latency is the number of enabled registers (0 to 3 cycles). Blocks move
+-- in and out with a valid/ready handshake (`in_valid`/`out_valid`), and a full
+-- pipeline accepts one block per cycle while `out_ready` is high. The output
+-- port `valid` keeps its meaning from `hamm_dec` and is lowered for a detected
+-- double-bit error.
+--
+-- Set `DATA_BITS` for a shortened code that drops the unused data bits from
+-- the top of the block. `PARITY_BITS` must be the fewest that fit them. An
+-- error address past the end of a shortened block is detected as invalid.
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+library work;
+use work.hamm_pkg.all;
+
+entity hamm_dec_pipe is
+    generic (
+        --! number of parity bits to decode (excluding 0th DED bit)
+        PARITY_BITS  : positive range 2 to positive'high;
+        --! number of data bits for a shortened code (0 uses the full block)
+        DATA_BITS    : natural := 0;
+        --! register the block with its error address
+        REG_SYNDROME : boolean := true;
+        --! register the corrected block with its error flags
+        REG_CORRECT  : boolean := true;
+        --! register the message with its error flags
+        REG_EXTRACT  : boolean := true
+    );
+    port (
+        clk       : in  logic;
+        --! synchronous active-high reset that empties the pipeline
+        rst       : in  logic;
+        in_valid  : in  logic;
+        in_ready  : out logic;
+        encoding  : in  logics(block_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        out_ready : in  logic;
+        out_valid : out logic;
+        message   : out logics(data_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        --! flag single-error correction (SEC)
+        corrected : out logic;
+        --! flag double-error detection (DED)
+        valid     : out logic
+    );
+end entity hamm_dec_pipe;
+
+
+architecture rtl of hamm_dec_pipe is
+    constant EVEN_PARITY : boolean := true;
+
+    constant TOTAL_BITS_SIZE  : positive := block_size(PARITY_BITS);
+
+    -- size of the (possibly shortened) block and message at the ports
+    constant BLOCK_BITS_SIZE : positive := block_size(PARITY_BITS, DATA_BITS);
+    constant DATA_BITS_SIZE  : positive := data_size(PARITY_BITS, DATA_BITS);
+
+    -- widths of the words held between stages
+    constant SYN_SIZE : positive := TOTAL_BITS_SIZE+1+PARITY_BITS;
+    constant COR_SIZE : positive := TOTAL_BITS_SIZE+2;
+    constant EXT_SIZE : positive := DATA_BITS_SIZE+2;
+
+    -- the encoding with the data bits dropped by a shortened code cleared
+    signal encoding_full : logics(TOTAL_BITS_SIZE-1 downto 0);
+
+    -- syndrome stage: the block, its overall parity, and its error address
+    signal err_detected : logic;
+    signal err_address  : logics(PARITY_BITS-1 downto 0);
+    signal syn_data     : logics(SYN_SIZE-1 downto 0);
+    signal syn_valid    : logic;
+    signal syn_ready    : logic;
+    signal syn_word     : logics(SYN_SIZE-1 downto 0);
+    signal syn_block    : logics(TOTAL_BITS_SIZE-1 downto 0);
+    signal syn_detected : logic;
+    signal syn_address  : logics(PARITY_BITS-1 downto 0);
+
+    -- correction stage: the corrected block and the error flags
+    signal cor_valid    : logic;
+    signal cor_ready    : logic;
+    signal cor_data     : logics(COR_SIZE-1 downto 0);
+    signal cor_word     : logics(COR_SIZE-1 downto 0);
+    signal cor_block    : logics(TOTAL_BITS_SIZE-1 downto 0);
+
+    -- extraction stage: the message and the error flags
+    signal ext_data     : logics(EXT_SIZE-1 downto 0);
+    signal ext_word     : logics(EXT_SIZE-1 downto 0);
+
+begin
+    assert DATA_BITS = 0 or parity_size(DATA_BITS) = PARITY_BITS
+        report "PARITY_BITS must be the fewest that fit DATA_BITS" severity failure;
+
+    --! restore the full hamming-code block (no-op for the full block)
+    encoding_full <= unshorten(encoding, PARITY_BITS);
+
+    --! computes the error address from the subset of bits each parity bit covers
+    u_check : entity work.hamm_check
+    generic map (
+        PARITY_BITS => PARITY_BITS
+    ) port map (
+        data       => encoding_full,
+        check_bits => err_address
+    );
+
+    --! computes the extra parity bit (0th bit) for double-error detection
+    u_ded : entity work.parity
+    generic map (
+        SIZE        => TOTAL_BITS_SIZE,
+        EVEN_PARITY => EVEN_PARITY
+    ) port map (
+        data      => encoding_full(TOTAL_BITS_SIZE-1 downto 0),
+        check_bit => err_detected
+    );
+
+    syn_data <= encoding_full & err_detected & err_address;
+
+    u_syn_reg : entity work.pipe_reg
+    generic map (
+        SIZE   => SYN_SIZE,
+        ENABLE => REG_SYNDROME
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => in_valid,
+        in_ready  => in_ready,
+        in_data   => syn_data,
+        out_valid => syn_valid,
+        out_ready => syn_ready,
+        out_data  => syn_word
+    );
+
+    syn_block    <= syn_word(SYN_SIZE-1 downto PARITY_BITS+1);
+    syn_detected <= syn_word(PARITY_BITS);
+    syn_address  <= syn_word(PARITY_BITS-1 downto 0);
+
+    -- the corrected block followed by the `corrected` and `valid` flags
+    cor_data <= correct(syn_block, syn_address, syn_detected) &
+                corrected_flag(syn_address, syn_detected, BLOCK_BITS_SIZE) &
+                valid_flag(syn_address, syn_detected, BLOCK_BITS_SIZE);
+
+    u_cor_reg : entity work.pipe_reg
+    generic map (
+        SIZE   => COR_SIZE,
+        ENABLE => REG_CORRECT
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => syn_valid,
+        in_ready  => syn_ready,
+        in_data   => cor_data,
+        out_valid => cor_valid,
+        out_ready => cor_ready,
+        out_data  => cor_word
+    );
+
+    cor_block <= cor_word(COR_SIZE-1 downto 2);
+
+    -- the message (parity bits removed) followed by the flags
+    ext_data <= extract(cor_block, DATA_BITS_SIZE) & cor_word(1 downto 0);
+
+    u_ext_reg : entity work.pipe_reg
+    generic map (
+        SIZE   => EXT_SIZE,
+        ENABLE => REG_EXTRACT
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => cor_valid,
+        in_ready  => cor_ready,
+        in_data   => ext_data,
+        out_valid => out_valid,
+        out_ready => out_ready,
+        out_data  => ext_word
+    );
+
+    message   <= ext_word(EXT_SIZE-1 downto 2);
+    corrected <= ext_word(1);
+    valid     <= ext_word(0);
+
+end architecture rtl;
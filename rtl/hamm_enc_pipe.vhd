@@ -0,0 +1,133 @@
+-- Pipelined hamming-code encoder that packages each `message` with its
+-- parity bits into an `encoding` for extended hamming code (SECDED).
+--
+-- Computes the same blocks as `hamm_enc` in two stages that can each be
+-- followed by a register:
+--
+--   1. parity - frames the message and computes the parity bits
+--   2. output - computes the 0th parity bit over the whole block
+--
+-- The latency is the number of enabled registers (0 to 2 cycles). Blocks move
+-- in and out with a valid/ready handshake, and a full pipeline accepts one
+-- block per cycle while `out_ready` is high.
+--
+-- Set `DATA_BITS` for a shortened code that drops the unused data bits from
+-- the top of the block. `PARITY_BITS` must be the fewest that fit them.
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+library work;
+use work.hamm_pkg.all;
+
+entity hamm_enc_pipe is
+    generic (
+        --! number of parity bits to encode (excluding 0th DED bit)
+        PARITY_BITS : positive range 2 to positive'high;
+        --! number of data bits for a shortened code (0 uses the full block)
+        DATA_BITS   : natural := 0;
+        --! register the framed block and its parity bits
+        REG_PARITY  : boolean := true;
+        --! register the output block
+        REG_OUTPUT  : boolean := true
+    );
+    port (
+        clk       : in  logic;
+        --! synchronous active-high reset that empties the pipeline
+        rst       : in  logic;
+        in_valid  : in  logic;
+        in_ready  : out logic;
+        message   : in  logics(data_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        out_ready : in  logic;
+        out_valid : out logic;
+        encoding  : out logics(block_size(PARITY_BITS, DATA_BITS)-1 downto 0)
+    );
+end entity hamm_enc_pipe;
+
+
+architecture rtl of hamm_enc_pipe is
+    constant EVEN_PARITY : boolean := true;
+
+    constant TOTAL_BITS_SIZE  : positive := block_size(PARITY_BITS);
+
+    -- size of the (possibly shortened) block at the ports
+    constant BLOCK_BITS_SIZE : positive := block_size(PARITY_BITS, DATA_BITS);
+
+    signal check_bits : logics(PARITY_BITS-1 downto 0);
+
+    signal empty_block : logics(TOTAL_BITS_SIZE-1 downto 0);
+    signal full_block  : logics(TOTAL_BITS_SIZE-1 downto 0);
+
+    -- parity stage: the block with every parity bit but the 0th
+    signal par_valid : logic;
+    signal par_ready : logic;
+    signal par_block : logics(TOTAL_BITS_SIZE-1 downto 0);
+
+    -- output stage: the finished (possibly shortened) block
+    signal ded_bit   : logic;
+    signal out_block : logics(BLOCK_BITS_SIZE-1 downto 0);
+
+begin
+    assert DATA_BITS = 0 or parity_size(DATA_BITS) = PARITY_BITS
+        report "PARITY_BITS must be the fewest that fit DATA_BITS" severity failure;
+
+    --! Formats the incoming message into a clean hamming-code block with parity
+    --! bits cleared.
+    empty_block <= frame(message, PARITY_BITS);
+
+    --! computes the parity bits from the subset of bits each one covers
+    u_check : entity work.hamm_check
+    generic map (
+        PARITY_BITS => PARITY_BITS
+    ) port map (
+        data       => empty_block,
+        check_bits => check_bits
+    );
+
+    --! fill the hamming-code block with computed parity bits
+    full_block <= insert_parity(empty_block, check_bits);
+
+    u_par_reg : entity work.pipe_reg
+    generic map (
+        SIZE   => TOTAL_BITS_SIZE,
+        ENABLE => REG_PARITY
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => in_valid,
+        in_ready  => in_ready,
+        in_data   => full_block,
+        out_valid => par_valid,
+        out_ready => par_ready,
+        out_data  => par_block
+    );
+
+    --! computes the extra parity bit (0th bit) for double-error detection
+    u_ded : entity work.parity
+    generic map (
+        SIZE        => TOTAL_BITS_SIZE-1,
+        EVEN_PARITY => EVEN_PARITY
+    ) port map (
+        data      => par_block(TOTAL_BITS_SIZE-1 downto 1),
+        check_bit => ded_bit
+    );
+
+    out_block <= par_block(BLOCK_BITS_SIZE-1 downto 1) & ded_bit;
+
+    u_out_reg : entity work.pipe_reg
+    generic map (
+        SIZE   => BLOCK_BITS_SIZE,
+        ENABLE => REG_OUTPUT
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => par_valid,
+        in_ready  => par_ready,
+        in_data   => out_block,
+        out_valid => out_valid,
+        out_ready => out_ready,
+        out_data  => encoding
+    );
+
+end architecture rtl;
@@ -26,6 +26,47 @@ package hamm_pkg is
     --! Computes the number of bits in the entire hamming-code block.
     function block_size(parity_bits: positive range 2 to positive'high) return positive;
 
+    --! Computes the fewest parity bits (excluding 0th DED bit) for a 
+    --! hamming-code block holding `data_bits` information bits.
+    function parity_size(data_bits: positive) return positive;
+
+    --! Computes the number of data bits for a shortened hamming-code block.
+    --!
+    --! A `data_bits` of 0 selects the full block.
+    function data_size(parity_bits: positive range 2 to positive'high; data_bits: natural) return positive;
+
+    --! Computes the number of bits in a shortened hamming-code block.
+    --!
+    --! A `data_bits` of 0 selects the full block.
+    function block_size(parity_bits: positive range 2 to positive'high; data_bits: natural) return positive;
+
+    --! Formats a `message` into a full hamming-code block with its parity bits
+    --! cleared. Data bits past the end of a shortened `message` stay cleared.
+    function frame(message: logics; parity_bits: positive range 2 to positive'high) return logics;
+
+    --! Fills the parity bits (excluding the 0th DED bit) of a full hamming-code
+    --! block `blk` with `check_bits`.
+    function insert_parity(blk: logics; check_bits: logics) return logics;
+
+    --! Restores a full hamming-code block from a (possibly shortened) 
+    --! `encoding` by clearing the dropped data bits.
+    function unshorten(encoding: logics; parity_bits: positive range 2 to positive'high) return logics;
+
+    --! Flips the bit at `address` in a full hamming-code block `blk` when an
+    --! error is `detected`.
+    function correct(blk: logics; address: logics; detected: logic) return logics;
+
+    --! Removes the parity bits from a full hamming-code block `blk` to reveal
+    --! its first `data_bits` information bits.
+    function extract(blk: logics; data_bits: positive) return logics;
+
+    --! Flags a single-error correction (SEC) of a block with `block_bits` bits.
+    function corrected_flag(address: logics; detected: logic; block_bits: positive) return logic;
+
+    --! Flags a block with `block_bits` bits as valid, which is lowered for a
+    --! detected double-bit error (DED) or an address past the end of the block.
+    function valid_flag(address: logics; detected: logic; block_bits: positive) return logic;
+
 end package hamm_pkg;
 
 
@@ -54,4 +95,105 @@ package body hamm_pkg is
         return 2**parity_bits;
     end function;
 
+    function parity_size(data_bits: positive) return positive is
+        variable parity_bits: positive;
+    begin
+        parity_bits := 2;
+        while data_size(parity_bits) < data_bits loop
+            parity_bits := parity_bits + 1;
+        end loop;
+        return parity_bits;
+    end function;
+
+    function data_size(parity_bits: positive range 2 to positive'high; data_bits: natural) return positive is
+    begin
+        if data_bits = 0 then
+            return data_size(parity_bits);
+        end if;
+        return data_bits;
+    end function;
+
+    function block_size(parity_bits: positive range 2 to positive'high; data_bits: natural) return positive is
+    begin
+        return data_size(parity_bits, data_bits)+parity_bits+1;
+    end function;
+
+    function frame(message: logics; parity_bits: positive range 2 to positive'high) return logics is
+        alias msg : logics(message'length-1 downto 0) is message;
+        variable blk : logics(block_size(parity_bits)-1 downto 0) := (others => '0');
+        variable ctr : natural := 0;
+    begin
+        for ii in 0 to blk'length-1 loop
+            -- use information bit otherwise reserve for parity bit
+            if is_pow_2(ii) = false then
+                if ctr < msg'length then
+                    blk(ii) := msg(ctr);
+                end if;
+                ctr := ctr + 1;
+            end if;
+        end loop;
+        return blk;
+    end function;
+
+    function insert_parity(blk: logics; check_bits: logics) return logics is
+        alias checks : logics(check_bits'length-1 downto 0) is check_bits;
+        variable full : logics(blk'length-1 downto 0) := blk;
+        variable ctr : natural := 0;
+    begin
+        for ii in 1 to full'length-1 loop
+            if is_pow_2(ii) = true then
+                full(ii) := checks(ctr);
+                ctr := ctr + 1;
+            end if;
+        end loop;
+        return full;
+    end function;
+
+    function unshorten(encoding: logics; parity_bits: positive range 2 to positive'high) return logics is
+        variable blk : logics(block_size(parity_bits)-1 downto 0) := (others => '0');
+    begin
+        blk(encoding'length-1 downto 0) := encoding;
+        return blk;
+    end function;
+
+    function correct(blk: logics; address: logics; detected: logic) return logics is
+        variable fixed : logics(blk'length-1 downto 0) := blk;
+    begin
+        if detected = '1' then
+            fixed(to_integer(unsigned(address))) := not fixed(to_integer(unsigned(address)));
+        end if;
+        return fixed;
+    end function;
+
+    function extract(blk: logics; data_bits: positive) return logics is
+        alias full : logics(blk'length-1 downto 0) is blk;
+        variable message : logics(data_bits-1 downto 0) := (others => '0');
+        variable ctr : natural := 0;
+    begin
+        for ii in 0 to full'length-1 loop
+            -- take only information bits (non-powers of 2) from the block
+            if is_pow_2(ii) = false and ctr < data_bits then
+                message(ctr) := full(ii);
+                ctr := ctr + 1;
+            end if;
+        end loop;
+        return message;
+    end function;
+
+    function corrected_flag(address: logics; detected: logic; block_bits: positive) return logic is
+    begin
+        if detected = '1' and to_integer(unsigned(address)) < block_bits then
+            return '1';
+        end if;
+        return '0';
+    end function;
+
+    function valid_flag(address: logics; detected: logic; block_bits: positive) return logic is
+    begin
+        if (unsigned(address) /= 0 and detected = '0') or (detected = '1' and to_integer(unsigned(address)) >= block_bits) then
+            return '0';
+        end if;
+        return '1';
+    end function;
+
 end package body;
\ No newline at end of file
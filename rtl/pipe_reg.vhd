@@ -0,0 +1,71 @@
+-- Register slice for a valid/ready handshake that holds one word of `data`.
+--
+-- A word moves across an interface on a rising edge when its `valid` and
+-- `ready` are both high. The slice takes a new word whenever it is empty or
+-- its current word moves on in the same cycle, so a chain of slices passes
+-- one word per cycle and stalls from the output back to the input.
+--
+-- Set `ENABLE` to false to replace the slice with wires (no latency).
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+library work;
+use work.hamm_pkg.all;
+
+entity pipe_reg is
+    generic (
+        --! width of the word held by the slice
+        SIZE   : positive;
+        --! register the word (true) or pass it through combinationally (false)
+        ENABLE : boolean := true
+    );
+    port (
+        clk       : in  logic;
+        --! synchronous active-high reset that empties the slice
+        rst       : in  logic;
+        in_valid  : in  logic;
+        in_ready  : out logic;
+        in_data   : in  logics(SIZE-1 downto 0);
+        out_valid : out logic;
+        out_ready : in  logic;
+        out_data  : out logics(SIZE-1 downto 0)
+    );
+end entity pipe_reg;
+
+
+architecture rtl of pipe_reg is
+begin
+
+    gen_reg: if ENABLE = true generate
+        signal valid_r : logic;
+        signal data_r  : logics(SIZE-1 downto 0);
+        -- the slice loads when it is empty or its word is taken
+        signal load    : logic;
+    begin
+        load <= out_ready or not valid_r;
+
+        process(clk)
+        begin
+            if rising_edge(clk) then
+                if rst = '1' then
+                    valid_r <= '0';
+                elsif load = '1' then
+                    valid_r <= in_valid;
+                    data_r <= in_data;
+                end if;
+            end if;
+        end process;
+
+        in_ready <= load;
+        out_valid <= valid_r;
+        out_data <= data_r;
+    end generate gen_reg;
+
+    gen_wire: if ENABLE = false generate
+        in_ready <= out_ready;
+        out_valid <= in_valid;
+        out_data <= in_data;
+    end generate gen_wire;
+
+end architecture rtl;
@@ -15,7 +15,11 @@ use work.hamm_pkg.all;
 entity hamm_dec_tb is 
     generic (
         --! number of parity bits to decode (excluding 0th DED bit)
-        PARITY_BITS : positive range 2 to positive'high := 4 
+        PARITY_BITS : positive range 2 to positive'high := 4;
+        --! number of data bits for a shortened code (0 uses the full block)
+        DATA_BITS   : natural := 0;
+        --! use the model's directed error-coverage stimulus instead of random noise
+        DIRECTED    : boolean := false
     );
 end entity hamm_dec_tb;
 
@@ -25,8 +29,8 @@ architecture sim of hamm_dec_tb is
     -- This record is automatically @generated by Verb.
     -- It is not intended for manual editing.
     type hamm_dec_bfm is record
-        encoding: logics(block_size(PARITY_BITS)-1 downto 0);
-        message: logics(data_size(PARITY_BITS)-1 downto 0);
+        encoding: logics(block_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        message: logics(data_size(PARITY_BITS, DATA_BITS)-1 downto 0);
         corrected: logic;
         valid: logic;
     end record;
@@ -43,7 +47,8 @@ begin
 
     dut: entity work.hamm_dec
     generic map (
-        PARITY_BITS => PARITY_BITS
+        PARITY_BITS => PARITY_BITS,
+        DATA_BITS   => DATA_BITS
     ) port map (
         encoding  => bfm.encoding,
         message   => bfm.message,
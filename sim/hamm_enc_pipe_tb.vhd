@@ -0,0 +1,127 @@
+-- Testbench for the `hamm_enc_pipe` module using file IO and event logging.
+--
+-- Each row of the vector files is one clock cycle. The inputs are driven
+-- after a rising edge and the outputs are checked before the next one. The
+-- encoding is only checked in cycles where the model expects `out_valid`.
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+library work;
+use work.hamm_pkg.all;
+
+library test;
+use test.verb.all;
+
+library std;
+use std.textio.all;
+
+entity hamm_enc_pipe_tb is
+    generic (
+        PARITY_BITS : positive range 2 to positive'high := 4;
+        --! number of data bits for a shortened code (0 uses the full block)
+        DATA_BITS   : natural := 0;
+        REG_PARITY  : boolean := true;
+        REG_OUTPUT  : boolean := true
+    );
+end entity hamm_enc_pipe_tb;
+
+
+architecture sim of hamm_enc_pipe_tb is
+
+    type hamm_enc_pipe_bfm is record
+        in_valid: logic;
+        in_ready: logic;
+        message: logics(data_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        out_ready: logic;
+        out_valid: logic;
+        encoding: logics(block_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+    end record;
+
+    signal bfm: hamm_enc_pipe_bfm;
+
+    --! internal testbench signals
+    constant PERIOD: time := 10 ns;
+    signal clk: logic := '0';
+    signal rst: logic := '1';
+    signal halt: boolean := false;
+
+    file events: text open write_mode is "events.log";
+begin
+
+    --! toggle the clock until the test completes
+    clk <= not clk after PERIOD/2 when halt = false;
+
+    dut: entity work.hamm_enc_pipe
+    generic map (
+        PARITY_BITS => PARITY_BITS,
+        DATA_BITS   => DATA_BITS,
+        REG_PARITY  => REG_PARITY,
+        REG_OUTPUT  => REG_OUTPUT
+    ) port map (
+        clk       => clk,
+        rst       => rst,
+        in_valid  => bfm.in_valid,
+        in_ready  => bfm.in_ready,
+        message   => bfm.message,
+        out_ready => bfm.out_ready,
+        out_valid => bfm.out_valid,
+        encoding  => bfm.encoding
+    );
+
+    --! assert the received outputs match expected model values
+    bench: process
+        file inputs  : text open read_mode is "inputs.txt";
+        file outputs : text open read_mode is "outputs.txt";
+
+        procedure send(file i: text) is
+            variable row: line;
+        begin
+            if endfile(i) = false then
+                readline(i, row);
+                drive(row, bfm.in_valid);
+                drive(row, bfm.message);
+                drive(row, bfm.out_ready);
+            end if;
+        end procedure;
+
+        procedure compare(file e: text; file o: text) is
+            variable row: line;
+            variable mdl: hamm_enc_pipe_bfm;
+        begin
+            if endfile(o) = false then
+                readline(o, row);
+                load(row, mdl.in_ready);
+                assert_eq(e, bfm.in_ready, mdl.in_ready, "in_ready");
+                load(row, mdl.out_valid);
+                assert_eq(e, bfm.out_valid, mdl.out_valid, "out_valid");
+                load(row, mdl.encoding);
+                -- the output block is only defined while it is valid
+                if mdl.out_valid = '1' then
+                    assert_eq(e, bfm.encoding, mdl.encoding, "encoding");
+                end if;
+            end if;
+        end procedure;
+    begin
+        -- hold the pipeline empty for a few cycles
+        bfm.in_valid <= '0';
+        bfm.out_ready <= '0';
+        for ii in 0 to 2 loop
+            wait until rising_edge(clk);
+        end loop;
+        rst <= '0';
+
+        while not endfile(inputs) loop
+            --! read given inputs from file for this cycle
+            send(inputs);
+
+            wait until falling_edge(clk);
+
+            compare(events, outputs);
+
+            wait until rising_edge(clk);
+        end loop;
+        complete(events, halt);
+    end process;
+
+end architecture;
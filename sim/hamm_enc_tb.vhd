@@ -14,7 +14,9 @@ use std.textio.all;
 
 entity hamm_enc_tb is 
     generic (
-        PARITY_BITS : positive range 2 to positive'high := 4
+        PARITY_BITS : positive range 2 to positive'high := 4;
+        --! number of data bits for a shortened code (0 uses the full block)
+        DATA_BITS   : natural := 0
     );
 end entity hamm_enc_tb;
 
@@ -24,8 +26,8 @@ architecture sim of hamm_enc_tb is
     -- This record is automatically @generated by Verb.
     -- It is not intended for manual editing.
     type hamm_enc_bfm is record
-        message: logics(data_size(PARITY_BITS)-1 downto 0);
-        encoding: logics(block_size(PARITY_BITS)-1 downto 0);
+        message: logics(data_size(PARITY_BITS, DATA_BITS)-1 downto 0);
+        encoding: logics(block_size(PARITY_BITS, DATA_BITS)-1 downto 0);
     end record;
     
     signal bfm: hamm_enc_bfm;
@@ -39,7 +41,8 @@ begin
 
     dut: entity work.hamm_enc
         generic map (
-            PARITY_BITS => PARITY_BITS
+            PARITY_BITS => PARITY_BITS,
+            DATA_BITS   => DATA_BITS
         ) port map (
             message   => bfm.message,
             encoding  => bfm.encoding